@@ -0,0 +1,184 @@
+"""
+ZIP Archive I/O untuk XLIFF Batch Translator
+=============================================
+Export WPML datang sebagai .zip (kadang berisi folder job bertingkat) dan
+hasil terjemahan dikirim balik sebagai .zip. Modul ini membaca member XLIFF
+langsung dari archive (zipfile.Path, tanpa extract ke disk) dan menulis hasil
+terjemahan langsung ke archive output, tanpa round-trip extract/copy/re-zip.
+
+- iter_xliff_sources(folder) : semua .xliff/.xlf di folder (rekursif) plus
+                               member XLIFF di setiap .zip
+- ArchiveMember              : referensi ke satu member (picklable, sehingga
+                               bisa dikirim ke worker process)
+- OutputArchives             : satu archive output per archive input, ditulis
+                               atomic (temp file + rename) saat ditutup
+"""
+
+import zipfile
+from contextlib import ExitStack
+from pathlib import Path, PurePosixPath
+
+from atomic_file import open_atomic
+
+XLIFF_EXTENSIONS = ('.xliff', '.xlf')
+ARCHIVE_EXTENSIONS = ('.zip',)
+
+# Metadata macOS/Windows yang sering ikut ter-zip
+_IGNORED_MEMBER_PARTS = ('__MACOSX',)
+
+
+class ArchiveMember:
+    """
+    An XLIFF member inside a .zip archive.
+    Behaves like a Path for what the translator needs (name, stem, suffix,
+    read_text) and only stores the archive path and member name.
+    """
+
+    def __init__(self, archive, member):
+        self.archive = Path(archive)
+        self.member = member
+        self._pure = PurePosixPath(member)
+
+    @property
+    def name(self):
+        return self._pure.name
+
+    @property
+    def stem(self):
+        return self._pure.stem
+
+    @property
+    def suffix(self):
+        return self._pure.suffix
+
+    @property
+    def parent(self):
+        """Folder of the member inside the archive ('' at the top level)."""
+        parent = str(self._pure.parent)
+        return '' if parent == '.' else parent
+
+    @property
+    def size(self):
+        """Uncompressed size of the member in bytes."""
+        with zipfile.ZipFile(self.archive) as archive:
+            return archive.getinfo(self.member).file_size
+
+    def read_text(self, encoding='utf-8'):
+        with zipfile.ZipFile(self.archive) as archive:
+            return zipfile.Path(archive, self.member).read_text(encoding=encoding)
+
+    def __eq__(self, other):
+        return (isinstance(other, ArchiveMember)
+                and (self.archive, self.member) == (other.archive, other.member))
+
+    def __hash__(self):
+        return hash((self.archive, self.member))
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+    def __str__(self):
+        return f"{self.archive}/{self.member}"
+
+    def __repr__(self):
+        return f"ArchiveMember({str(self.archive)!r}, {self.member!r})"
+
+
+def _is_xliff_name(name):
+    return name.lower().endswith(XLIFF_EXTENSIONS)
+
+
+def iter_archive_members(archive_path):
+    """Yield an ArchiveMember for every XLIFF file in the archive, nested folders included."""
+    with zipfile.ZipFile(archive_path) as archive:
+        names = sorted(info.filename for info in archive.infolist() if not info.is_dir())
+    for name in names:
+        if _is_xliff_name(name) and not any(part in _IGNORED_MEMBER_PARTS for part in name.split('/')):
+            yield ArchiveMember(archive_path, name)
+
+
+def iter_input_paths(folder):
+    """
+    Yield every .xliff/.xlf file and .zip archive under folder, recursively.
+    Hidden folders are ignored.
+    """
+    root = Path(folder)
+    for path in sorted(root.rglob('*')):
+        relative = path.relative_to(root)
+        if any(part.startswith('.') for part in relative.parts) or not path.is_file():
+            continue
+        if path.suffix.lower() in XLIFF_EXTENSIONS + ARCHIVE_EXTENSIONS:
+            yield path
+
+
+def expand_xliff_source(path):
+    """Yield path itself for an XLIFF file, or an ArchiveMember per XLIFF member of a .zip."""
+    if path.suffix.lower() not in ARCHIVE_EXTENSIONS:
+        yield path
+        return
+    try:
+        yield from iter_archive_members(path)
+    except zipfile.BadZipFile:
+        print(f"  [!] Archive rusak, dilewati: {path}")
+
+
+def iter_xliff_sources(folder):
+    """
+    Yield every XLIFF source under folder, recursively: files on disk as Path,
+    members of .zip archives as ArchiveMember. Hidden folders are ignored.
+    """
+    for path in iter_input_paths(folder):
+        yield from expand_xliff_source(path)
+
+
+class OutputArchives:
+    """
+    Output archives keyed by input archive. Members are written as soon as
+    they are ready; each archive is renamed into place when closed, so a
+    failed run never leaves a truncated .zip.
+    """
+
+    def __init__(self, output_folder, input_folder=None, compression=zipfile.ZIP_DEFLATED):
+        self.output_folder = Path(output_folder)
+        self.input_folder = Path(input_folder) if input_folder is not None else None
+        self.compression = compression
+        self._archives = {}
+        self._stack = ExitStack()
+
+    def path_for(self, archive):
+        """
+        Output archive for an input archive: its path relative to
+        input_folder is mirrored under output_folder, so same-named
+        archives in different job folders never overwrite each other.
+        """
+        archive = Path(archive)
+        relative = Path(archive.name)
+        if self.input_folder is not None:
+            try:
+                relative = archive.relative_to(self.input_folder)
+            except ValueError:
+                pass
+        return self.output_folder / relative
+
+    def write(self, member, filename, text):
+        """Write text as filename, in the same folder the source member had."""
+        archive = self._archives.get(member.archive)
+        if archive is None:
+            path = self.path_for(member.archive)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = self._stack.enter_context(open_atomic(path, 'wb'))
+            archive = self._stack.enter_context(zipfile.ZipFile(handle, 'w', self.compression))
+            self._archives[member.archive] = archive
+        arcname = f"{member.parent}/{filename}" if member.parent else filename
+        archive.writestr(arcname, text.encode('utf-8'))
+        return f"{self.path_for(member.archive)}/{arcname}"
+
+    def close(self):
+        self._stack.close()
+        self._archives = {}
+
+    def abort(self):
+        """Drop archives that are still open (the previous output stays untouched)."""
+        self._stack.__exit__(RuntimeError, RuntimeError("aborted"), None)
+        self._stack = ExitStack()
+        self._archives = {}
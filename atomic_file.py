@@ -0,0 +1,40 @@
+"""
+Atomic File Writes untuk XLIFF Batch Translator
+================================================
+Output ditulis ke file sementara di folder yang sama, lalu di-rename ke nama
+akhir dengan os.replace(). Jika proses crash atau error di tengah penulisan,
+folder output tidak pernah berisi XLIFF yang terpotong: yang ada hanya file
+lama (atau tidak ada sama sekali) dan file sementara dihapus.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+FILE_MODE = 0o644
+
+
+@contextmanager
+def open_atomic(path, mode='w', encoding='utf-8'):
+    """
+    Open a temporary file next to path; on clean exit it atomically replaces path.
+    On exception the temporary file is removed and path is left untouched.
+    """
+    path = Path(path)
+    binary = 'b' in mode
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if binary else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp membuat file 0600; samakan dengan file output biasa
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,306 @@
+"""
+Benchmark Suite untuk XLIFF Batch Translator
+=============================================
+Mengukur throughput tiap tahap translate_xliff.py secara terpisah di atas
+corpus XLIFF yang ada di repo (output/, raw data/ termasuk isi file .zip)
+plus varian sintetis yang diperbesar (--scale).
+
+Tahap yang diukur:
+- extract    : iter_trans_units()
+- skip       : should_skip_translation()
+- batch      : translate_texts() dengan backend pseudo (offline, tanpa network)
+- post_rules : apply_post_translation_rules()
+- entities   : fix_entity_encoding()
+- write      : finalize_xliff_file() (single pass + atomic rename)
+
+Hasil dilaporkan dalam segment/s dan MB/s dan dibandingkan dengan baseline
+yang tersimpan di BASELINE_FILE. Tahap yang lebih lambat dari baseline
+melebihi REGRESSION_TOLERANCE ditandai [REGRESI] dan exit code = 1.
+
+Cara penggunaan:
+  python benchmark_xliff.py                  # jalankan & bandingkan dengan baseline
+  python benchmark_xliff.py --save-baseline  # simpan hasil sebagai baseline baru
+  python benchmark_xliff.py --scale 1 4 16 --repeat 5
+"""
+
+import os
+import re
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import zipfile
+import contextlib
+from pathlib import Path
+
+import translate_xliff as tx
+
+# Fix encoding untuk Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+# ==================== KONFIGURASI ====================
+CORPUS_FOLDERS = ["output", "raw data", "raw data espanol", "tes_upload"]
+BASELINE_FILE = "benchmark_baseline.json"
+DEFAULT_SCALES = [1, 4]         # 1 = corpus asli, N = tiap file diperbesar N kali
+DEFAULT_REPEAT = 3              # Ambil waktu terbaik dari N percobaan
+REGRESSION_TOLERANCE = 0.25     # Lebih lambat 25% dari baseline = regresi
+# =====================================================
+
+STAGES = ['extract', 'skip', 'batch', 'post_rules', 'entities', 'write']
+
+_TRANS_UNIT_ID_RE = re.compile(r'(<trans-unit\b[^>]*?\bid=")([^"]*)(")')
+
+
+def load_corpus(folders=CORPUS_FOLDERS):
+    """
+    Read every .xliff/.xlf file under folders, including members of .zip archives.
+    Returns a list of (name, content).
+    """
+    documents = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for path in sorted(Path(folder).rglob('*')):
+            suffix = path.suffix.lower()
+            if suffix in ('.xliff', '.xlf'):
+                documents.append((str(path), path.read_text(encoding='utf-8')))
+            elif suffix == '.zip':
+                with zipfile.ZipFile(path) as archive:
+                    for member in sorted(archive.namelist()):
+                        if member.lower().endswith(('.xliff', '.xlf')):
+                            content = archive.read(member).decode('utf-8')
+                            documents.append((f"{path}/{member}", content))
+    return documents
+
+
+def scale_document(content, factor):
+    """Synthetic variant: repeat the trans-units factor times with unique ids."""
+    if factor <= 1:
+        return content
+    start = content.find('<trans-unit')
+    end = content.rfind('</trans-unit>')
+    if start == -1 or end == -1:
+        return content
+    end += len('</trans-unit>')
+    body = content[start:end]
+    copies = [body] + [
+        _TRANS_UNIT_ID_RE.sub(lambda m, i=i: f"{m.group(1)}{m.group(2)}-x{i}{m.group(3)}", body)
+        for i in range(1, factor)
+    ]
+    return content[:start] + ''.join(copies) + content[end:]
+
+
+def best_time(fn, repeat):
+    """Best wall time of repeat runs of fn()."""
+    best = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(documents, scale=1, repeat=DEFAULT_REPEAT):
+    """
+    Time each stage over the documents scaled by scale.
+    Returns {stage: {'seconds', 'segments', 'bytes', 'segments_per_s', 'mb_per_s'}}.
+    """
+    saved = (tx.TRANSLATION_API, tx.USE_TRANSLATION_MEMORY)
+    tx.TRANSLATION_API = 'pseudo'
+    tx.USE_TRANSLATION_MEMORY = False
+    try:
+        return _run_stages(documents, scale, repeat)
+    finally:
+        tx.TRANSLATION_API, tx.USE_TRANSLATION_MEMORY = saved
+
+
+def _run_stages(documents, scale, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp) / 'input'
+        output_dir = Path(tmp) / 'output'
+        input_dir.mkdir()
+        output_dir.mkdir()
+
+        plans = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, (_, content) in enumerate(documents):
+                path = input_dir / f"doc{i}.xliff"
+                path.write_text(scale_document(content, scale), encoding='utf-8')
+                plan = tx.prepare_xliff_file(path)
+                if plan is not None:
+                    plans.append(plan)
+
+        units = [unit for plan in plans for unit in plan['units']]
+        total_bytes = sum(len(plan['content'].encode('utf-8')) for plan in plans)
+        translatable = [(plan, unit) for plan in plans for unit in plan['units'] if not unit['skip']]
+        translated = {}
+
+        def extract():
+            for plan in plans:
+                for _ in tx.iter_trans_units(plan['content']):
+                    pass
+
+        def skip():
+            for unit in units:
+                tx.should_skip_translation(unit['resname'], unit['source_text'])
+
+        def batch():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for plan in plans:
+                    translated[plan['file_path']] = tx.translate_texts(
+                        None, plan['texts_for_translation'], plan['target_lang'], plan['source_lang']
+                    )
+
+        post_results = []
+
+        def post_rules():
+            post_results.clear()
+            for plan, unit in translatable:
+                text = translated[plan['file_path']][unit['translate_index']]
+                post_results.append(tx.apply_post_translation_rules(
+                    text, unit['source_text'], plan['is_cr_header_file'], unit['restore'], plan['target_lang']
+                ))
+
+        def entities():
+            for text in post_results:
+                tx.fix_entity_encoding(text)
+
+        def write():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for plan in plans:
+                    tx.finalize_xliff_file(plan, translated[plan['file_path']], str(output_dir))
+
+        stage_fns = {
+            'extract': (extract, len(units)),
+            'skip': (skip, len(units)),
+            'batch': (batch, len(translatable)),
+            'post_rules': (post_rules, len(translatable)),
+            'entities': (entities, len(translatable)),
+            'write': (write, len(units)),
+        }
+
+        results = {}
+        for stage in STAGES:
+            fn, segments = stage_fns[stage]
+            seconds = best_time(fn, repeat)
+            results[stage] = {
+                'seconds': seconds,
+                'segments': segments,
+                'bytes': total_bytes,
+                'segments_per_s': segments / seconds if seconds else 0.0,
+                'mb_per_s': total_bytes / 1e6 / seconds if seconds else 0.0,
+            }
+        return results
+
+
+def load_baseline(path=BASELINE_FILE):
+    """Stored baseline {'<stage>@x<scale>': {'segments_per_s', 'mb_per_s'}}, or {}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Store results as the new baseline."""
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': {
+            key: {'segments_per_s': round(r['segments_per_s'], 1), 'mb_per_s': round(r['mb_per_s'], 3)}
+            for key, r in results.items()
+        },
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare segments/s with the baseline.
+    Returns {key: ratio} (current / baseline) and the list of regressed keys.
+    """
+    ratios = {}
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference or not reference.get('segments_per_s'):
+            continue
+        ratio = result['segments_per_s'] / reference['segments_per_s']
+        ratios[key] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(key)
+    return ratios, regressions
+
+
+def print_results(results, ratios, regressions):
+    print(f"\n{'tahap':<18}{'segment':>10}{'MB':>8}{'detik':>10}{'segment/s':>14}{'MB/s':>9}{'vs baseline':>14}")
+    print("-" * 83)
+    for key, r in results.items():
+        ratio = ratios.get(key)
+        versus = f"{ratio:.2f}x" if ratio is not None else "-"
+        if key in regressions:
+            versus += " [REGRESI]"
+        print(f"{key:<18}{r['segments']:>10,}{r['bytes'] / 1e6:>8.2f}{r['seconds']:>10.3f}"
+              f"{r['segments_per_s']:>14,.0f}{r['mb_per_s']:>9.2f}{versus:>14}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per tahap untuk translate_xliff.py")
+    parser.add_argument('--scale', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="Faktor perbesaran corpus sintetis (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Jumlah percobaan per tahap, diambil yang tercepat")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="File baseline JSON")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Simpan hasil run ini sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help="Toleransi perlambatan sebelum dianggap regresi (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    documents = load_corpus()
+    if not documents:
+        print(f"[!] Tidak ada XLIFF ditemukan di {', '.join(CORPUS_FOLDERS)}")
+        return 1
+
+    total_mb = sum(len(content.encode('utf-8')) for _, content in documents) / 1e6
+    print(f"[BENCH] Corpus: {len(documents)} file XLIFF, {total_mb:.2f} MB")
+    print(f"[BENCH] Skala: {', '.join(f'x{s}' for s in args.scale)}, terbaik dari {args.repeat} percobaan")
+
+    results = {}
+    for scale in args.scale:
+        for stage, result in run_benchmarks(documents, scale, args.repeat).items():
+            results[f"{stage}@x{scale}"] = result
+
+    baseline = load_baseline(args.baseline)
+    ratios, regressions = compare_to_baseline(results, baseline, args.tolerance)
+    print_results(results, ratios, regressions)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n[SAVED] Baseline disimpan: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\n[INFO] Belum ada baseline, jalankan dengan --save-baseline")
+    elif regressions:
+        print(f"\n[REGRESI] {len(regressions)} tahap lebih lambat dari baseline: {', '.join(regressions)}")
+        return 1
+    else:
+        print(f"\n[OK] Tidak ada regresi (toleransi {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Checkpoint Journal untuk XLIFF Batch Translator
+================================================
+Journal append-only (JSONL) per file input. Setiap batch yang selesai
+diterjemahkan langsung dicatat di JOURNAL_FOLDER/<nama file>.<hash>.jsonl, sehingga
+jika proses mati di tengah file (crash, Ctrl+C, kuota DeepL habis) segment
+yang sudah dibayar tidak hilang. Run berikutnya membaca journal dan hanya
+mengirim unit yang belum diterjemahkan.
+
+File  : hash dari path relatif terhadap INPUT_FOLDER (+ nama member untuk
+        isi .zip), sehingga input/a/page.xliff dan input/b/page.xliff
+        tidak berbagi journal
+Key   : trans-unit id + hash source text + target language
+Format: satu JSON object per baris {"id", "src", "lang", "target"}
+Journal dihapus setelah file output berhasil ditulis.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path, PurePosixPath
+
+# ==================== KONFIGURASI ====================
+JOURNAL_FOLDER = ".journal"
+# =====================================================
+
+
+def hash_source_text(text):
+    """Short stable hash of a unit's source text."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()[:16]
+
+
+def journal_name(file_path, root=None):
+    """
+    Journal file name for an input file: its name plus a hash of its path
+    relative to root (the input folder). file_path may also be an archive
+    member (archive_io.ArchiveMember); the member name is part of the key.
+    """
+    member = getattr(file_path, 'member', None)
+    path = Path(file_path.archive) if member is not None else Path(file_path)
+    name = PurePosixPath(member).name if member is not None else path.name
+    key = os.path.abspath(path)
+    if root is not None:
+        try:
+            key = Path(key).relative_to(os.path.abspath(root)).as_posix()
+        except ValueError:
+            pass
+    if member is not None:
+        key = f"{key}!{member}"
+    digest = hashlib.sha256(str(key).encode('utf-8')).hexdigest()[:12]
+    return f"{name}.{digest}.jsonl"
+
+
+class CheckpointJournal:
+    """
+    Append-only journal for one input file.
+    Thread-safe: batches selesai di thread API dan dicatat dari sana.
+    """
+
+    def __init__(self, file_path, folder=None, root=None):
+        self.path = Path(folder or JOURNAL_FOLDER) / journal_name(file_path, root)
+        self._lock = threading.Lock()
+        self._file = None
+        self._removed = False
+
+    def load(self, target_lang):
+        """
+        Read completed units for target_lang.
+        Returns {(unit_id, source_hash): translated_text}. A torn last line
+        (crash in the middle of a write) is ignored.
+        """
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('lang') == target_lang:
+                    entries[(entry['id'], entry['src'])] = entry['target']
+        return entries
+
+    def record(self, units, target_lang):
+        """Append (unit_id, source_text, translated_text) entries and flush them to disk."""
+        lines = [
+            json.dumps({'id': unit_id, 'src': hash_source_text(source),
+                        'lang': target_lang, 'target': translated}, ensure_ascii=False) + '\n'
+            for unit_id, source, translated in units
+        ]
+        if not lines:
+            return
+        with self._lock:
+            # Batch yang dipakai bersama file lain bisa selesai setelah remove()
+            if self._removed:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(''.join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """
+        Drop the journal once the output file is safely written. Later
+        record() calls are ignored, so the journal is not recreated.
+        """
+        with self._lock:
+            self._removed = True
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,59 @@
+"""
+Shared HTTP Session untuk XLIFF Batch Translator
+=================================================
+Satu requests.Session per proses dengan connection pool keep-alive, dipakai
+ulang lintas batch dan file. Tanpa ini setiap requests.post() membuka koneksi
+TCP+TLS baru ke translation.googleapis.com, dan handshake TLS mendominasi
+latency untuk segment pendek.
+
+(DeepL SDK sudah memakai session internal sendiri.)
+"""
+
+import threading
+
+# ==================== KONFIGURASI ====================
+HTTP_POOL_CONNECTIONS = 4     # Jumlah host yang di-cache pool-nya
+HTTP_POOL_MAXSIZE = 16        # Koneksi keep-alive per host (>= request paralel)
+HTTP_CONNECT_TIMEOUT = 5      # Detik untuk membuka koneksi
+HTTP_READ_TIMEOUT = 60        # Detik menunggu response (batch besar bisa lama)
+# =====================================================
+
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE):
+    """Build a requests.Session with a tuned keep-alive pool and gzip responses."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # Retry ditangani rate_limiter.py, bukan oleh urllib3
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+def get_http_session():
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_http_session()
+        return _session
+
+
+def close_http_session():
+    """Close the shared session and its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
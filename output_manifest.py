@@ -0,0 +1,272 @@
+"""
+Output Manifest untuk XLIFF Batch Translator
+=============================================
+Index persisten (SQLite) dari semua file output yang sudah dihasilkan, di
+OUTPUT_FOLDER/.manifest.sqlite3. Menggantikan scan folder batch_* per file:
+
+- Cek "output sudah ada?"  : satu lookup by filename atau source hash + bahasa
+- Alokasi folder batch     : nomor batch aktif dan jumlah isinya disimpan,
+                             tidak perlu listdir/glob lagi
+
+Key   : source hash + target language + filename
+Output dicatat 'pending' sebelum ditulis dan 'done' setelah rename atomik.
+Saat manifest dibuka, entry 'pending' dari run yang terputus dicocokkan
+dengan disk, sehingga manifest tetap konsisten walau proses mati di tengah.
+Saat dibuka, hanya folder batch_* yang mtime-nya berubah sejak scan terakhir
+yang di-listdir ulang; file di root yang belum tercatat dicek saat find()
+tidak menemukannya. Output yang ditulis proses lain atau dikembalikan manual
+tetap ditemukan tanpa scan penuh setiap run.
+
+Tabel zip_members mencatat hash isi setiap member di batch_N.zip, sehingga
+zip_batch_folders() hanya menambah/mengganti member yang isinya berubah
+(bukan berdasarkan mtime, yang rusak oleh copy dan checkout).
+"""
+
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+# ==================== KONFIGURASI ====================
+MANIFEST_DB_NAME = ".manifest.sqlite3"
+# =====================================================
+
+XLIFF_EXTENSIONS = ('.xliff', '.xlf')
+BATCH_PREFIX = 'batch_'
+SCAN_SETTLE_NS = 2_000_000_000
+
+
+def hash_content(content):
+    """Stable hash of an input file's content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _batch_number(folder_name):
+    suffix = folder_name[len(BATCH_PREFIX):]
+    return int(suffix) if suffix.isdigit() else None
+
+
+class OutputManifest:
+    """
+    Index of produced outputs and of the batch folder being filled.
+    Thread-safe: satu koneksi dipakai bersama dan dijaga dengan lock.
+    """
+
+    def __init__(self, output_folder, files_per_batch, db_name=MANIFEST_DB_NAME):
+        self.output_folder = Path(output_folder)
+        self.files_per_batch = files_per_batch
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        db_path = self.output_folder / db_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS outputs ('
+            ' filename TEXT PRIMARY KEY,'
+            ' batch INTEGER, source_hash TEXT, target_lang TEXT,'
+            ' state TEXT, created_at REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_source ON outputs(source_hash, target_lang)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_batch ON outputs(batch)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS zip_members ('
+            ' batch INTEGER, member TEXT, content_hash TEXT,'
+            ' PRIMARY KEY (batch, member))'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS folder_scans ('
+            ' folder TEXT PRIMARY KEY, mtime_ns INTEGER)'
+        )
+        self._conn.commit()
+        self.reconcile()
+        self.recover()
+        self._load_current_batch()
+
+    def reconcile(self):
+        """
+        Index outputs on disk that are not recorded yet. The output root is
+        listed once (first open); after that new batch_N folders are found
+        by probing past the highest known number, and a batch folder is
+        listed again only when its mtime differs from the last scan.
+        Output files dropped in the root later are picked up by find().
+        """
+        with self._lock:
+            scanned = dict(self._conn.execute('SELECT folder, mtime_ns FROM folder_scans').fetchall())
+            batches = {row[0] for row in self._conn.execute(
+                'SELECT DISTINCT batch FROM outputs WHERE batch IS NOT NULL')}
+        batches.update(_batch_number(folder) for folder in scanned if folder.startswith(BATCH_PREFIX))
+        batches.discard(None)
+        
+        rows = []
+        scans = []
+        now = time.time()
+        
+        def index(batch, entries):
+            for path in entries:
+                if path.is_file() and path.suffix.lower() in XLIFF_EXTENSIONS:
+                    rows.append((path.name, batch, None, None, 'done', now))
+        
+        if '' not in scanned:
+            entries = list(self.output_folder.iterdir())
+            index(None, entries)
+            batches.update(
+                _batch_number(d.name) for d in entries
+                if d.is_dir() and d.name.startswith(BATCH_PREFIX) and _batch_number(d.name) is not None
+            )
+            # mtime root tidak dipakai: file manifest/WAL di root mengubahnya setiap run
+            scans.append(('', 0))
+        
+        # Folder batch baru (mis. dikembalikan manual) setelah nomor tertinggi
+        batch = max(batches, default=0) + 1
+        while (self.output_folder / f"{BATCH_PREFIX}{batch}").is_dir():
+            batches.add(batch)
+            batch += 1
+        
+        for batch in sorted(batches):
+            folder = self.output_folder / f"{BATCH_PREFIX}{batch}"
+            try:
+                mtime_ns = folder.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if scanned.get(folder.name) == mtime_ns:
+                continue
+            index(batch, folder.iterdir())
+            # mtime yang baru saja berubah bisa sama dengan perubahan berikutnya
+            # (resolusi timestamp kasar): belum dicatat, folder di-scan lagi nanti
+            if time.time_ns() - mtime_ns > SCAN_SETTLE_NS:
+                scans.append((folder.name, mtime_ns))
+        
+        with self._lock:
+            self._conn.executemany('INSERT OR IGNORE INTO outputs VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._conn.executemany('INSERT OR REPLACE INTO folder_scans VALUES (?, ?)', scans)
+            self._conn.commit()
+
+    def recover(self):
+        """Settle outputs left 'pending' by an interrupted run."""
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT filename, batch FROM outputs WHERE state = 'pending'"
+            ).fetchall()
+            for filename, batch in pending:
+                if self.path_for(filename, batch).exists():
+                    self._conn.execute("UPDATE outputs SET state = 'done' WHERE filename = ?", (filename,))
+                else:
+                    self._conn.execute('DELETE FROM outputs WHERE filename = ?', (filename,))
+            self._conn.commit()
+
+    def _load_current_batch(self):
+        row = self._conn.execute(
+            'SELECT batch, COUNT(*) FROM outputs WHERE batch = (SELECT MAX(batch) FROM outputs)'
+        ).fetchone()
+        self._batch, self._batch_count = row if row and row[0] is not None else (0, 0)
+
+    def path_for(self, filename, batch):
+        folder = self.output_folder / f"{BATCH_PREFIX}{batch}" if batch is not None else self.output_folder
+        return folder / filename
+
+    def find(self, filenames, source_hash=None, target_lang=None):
+        """
+        Path of an existing output with one of filenames, or of the same
+        source and target language. Returns None if there is none.
+        """
+        with self._lock:
+            names = [name for name in dict.fromkeys(filenames) if name]
+            row = self._conn.execute(
+                f"SELECT filename, batch FROM outputs WHERE state = 'done' AND "
+                f"(filename IN ({','.join('?' * len(names))}) OR (source_hash = ? AND target_lang = ?)) LIMIT 1",
+                [*names, source_hash, target_lang]
+            ).fetchone()
+            if row is None:
+                # Output di root yang belum tercatat (mis. ditulis translate_xliff.py)
+                for name in names:
+                    path = self.path_for(name, None)
+                    if path.is_file():
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO outputs VALUES (?, NULL, NULL, NULL, 'done', ?)",
+                            (name, time.time())
+                        )
+                        self._conn.commit()
+                        return path
+                return None
+            path = self.path_for(*row)
+            if not path.exists():
+                # Output dihapus manual: lupakan entry-nya
+                self._conn.execute('DELETE FROM outputs WHERE filename = ?', (row[0],))
+                self._conn.commit()
+                return None
+            return path
+
+    def reserve(self, filename, source_hash=None, target_lang=None):
+        """
+        Allocate a slot in the active batch folder (a new one once it holds
+        files_per_batch outputs) and record the output as pending.
+        Returns (path, created) where created tells if a new batch folder was started.
+        """
+        with self._lock:
+            created = self._batch == 0 or self._batch_count >= self.files_per_batch
+            if created:
+                self._batch += 1
+                self._batch_count = 0
+            self._batch_count += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, 'pending', ?)",
+                (filename, self._batch, source_hash, target_lang, time.time())
+            )
+            self._conn.commit()
+            path = self.path_for(filename, self._batch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path, created
+
+    def commit(self, filename):
+        """Mark a reserved output as written."""
+        with self._lock:
+            self._conn.execute("UPDATE outputs SET state = 'done' WHERE filename = ?", (filename,))
+            self._conn.commit()
+
+    def release(self, filename):
+        """Drop a reserved output whose write failed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch FROM outputs WHERE filename = ? AND state = 'pending'", (filename,)
+            ).fetchone()
+            if row is None:
+                return
+            if row[0] == self._batch:
+                self._batch_count -= 1
+            self._conn.execute('DELETE FROM outputs WHERE filename = ?', (filename,))
+            self._conn.commit()
+
+    def batch_outputs(self):
+        """{batch: [filename, ...]} of the written outputs in batch folders."""
+        batches = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT batch, filename FROM outputs WHERE batch IS NOT NULL AND state = 'done' "
+                "ORDER BY batch, filename"
+            ).fetchall()
+        for batch, filename in rows:
+            batches.setdefault(batch, []).append(filename)
+        return batches
+
+    def zipped_members(self, batch):
+        """{member: content hash} recorded for batch_N.zip."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT member, content_hash FROM zip_members WHERE batch = ?', (batch,)
+            ).fetchall()
+        return dict(rows)
+
+    def record_zip(self, batch, members):
+        """Replace the recorded members of batch_N.zip with {member: content hash}."""
+        with self._lock:
+            self._conn.execute('DELETE FROM zip_members WHERE batch = ?', (batch,))
+            self._conn.executemany(
+                'INSERT INTO zip_members VALUES (?, ?, ?)',
+                [(batch, member, content_hash) for member, content_hash in members.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,147 @@
+"""
+Adaptive Rate Limiter untuk XLIFF Batch Translator
+===================================================
+Token bucket dengan AIMD (additive increase / multiplicative decrease),
+dipakai bersama oleh backend DeepL dan Google.
+
+- Request hanya menunggu jika token habis (tidak ada sleep tetap per batch)
+- 429/503 dari provider: rate dipotong setengah, semua thread pause sesuai
+  Retry-After atau exponential backoff dengan jitter
+- Setiap request sukses menaikkan rate sedikit demi sedikit sampai max_rate
+"""
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+# ==================== KONFIGURASI ====================
+RATE_LIMIT_INITIAL_RPS = 5.0    # Request per detik di awal run
+RATE_LIMIT_MIN_RPS = 0.2        # Batas bawah setelah throttling berulang
+RATE_LIMIT_MAX_RPS = 20.0       # Batas atas saat provider sehat
+RATE_LIMIT_BURST = 4            # Jumlah request yang boleh langsung dikirim
+RATE_LIMIT_INCREASE = 0.5       # Kenaikan rps per request sukses
+RATE_LIMIT_DECREASE = 0.5       # Faktor pengali rps saat di-throttle
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+MAX_RETRIES = 6                 # Retry maksimal per batch saat 429/503
+# =====================================================
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class RateLimiter:
+    """Thread-safe token bucket whose refill rate adapts with AIMD."""
+
+    def __init__(self, rate=RATE_LIMIT_INITIAL_RPS, min_rate=RATE_LIMIT_MIN_RPS,
+                 max_rate=RATE_LIMIT_MAX_RPS, burst=RATE_LIMIT_BURST,
+                 increase=RATE_LIMIT_INCREASE, decrease=RATE_LIMIT_DECREASE,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_cap=BACKOFF_CAP_SECONDS):
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.capacity = float(max(1, burst))
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttle_count = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.waited_seconds += waited
+                        return waited
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self):
+        """Additive increase after a healthy response."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with equal jitter."""
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def on_throttle(self, attempt, retry_after=None):
+        """
+        Multiplicative decrease after 429/503 and pause all callers.
+        Returns the pause in seconds (Retry-After wins over computed backoff).
+        """
+        delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+        with self._lock:
+            self.throttle_count += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def get_http_status(error):
+    """HTTP status code carried by a requests or deepl exception, if any."""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(error, 'http_status_code', None)
+    return status
+
+
+def get_retry_after(error):
+    """Retry-After seconds carried by an exception's HTTP response, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    return parse_retry_after(headers.get('Retry-After'))
+
+
+def is_throttle_error(error):
+    """True if the provider asked us to slow down (429/503 or 'too many requests')."""
+    if get_http_status(error) in THROTTLE_STATUS_CODES:
+        return True
+    return 'too many requests' in str(error).lower()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name):
+    """Return the shared limiter for a backend, creating it on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter()
+        return _limiters[name]
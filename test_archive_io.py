@@ -0,0 +1,96 @@
+"""
+Test Suite for archive_io.py
+=============================
+Run with: pytest test_archive_io.py -v
+"""
+
+import pytest
+import sys
+import os
+import pickle
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from archive_io import ArchiveMember, OutputArchives, iter_xliff_sources
+
+
+@pytest.fixture
+def input_folder(tmp_path):
+    folder = tmp_path / "input"
+    (folder / "job-1" / "sub").mkdir(parents=True)
+    (folder / ".journal").mkdir()
+    (folder / "top.xliff").write_text("<xliff>top</xliff>", encoding="utf-8")
+    (folder / "job-1" / "sub" / "nested.xlf").write_text("<xliff>nested</xliff>", encoding="utf-8")
+    (folder / ".journal" / "hidden.xliff").write_text("x", encoding="utf-8")
+    (folder / "notes.txt").write_text("x", encoding="utf-8")
+    with zipfile.ZipFile(folder / "export.zip", "w") as archive:
+        archive.writestr("job-2/page.xliff", "<xliff>Kanzlei für Erbrecht</xliff>")
+        archive.writestr("readme.txt", "x")
+        archive.writestr("__MACOSX/job-2/._page.xliff", "x")
+    return folder
+
+
+class TestIterXliffSources:
+    """Test recursive ingest of files and archive members."""
+
+    def test_recursive_with_archive_members(self, input_folder):
+        sources = list(iter_xliff_sources(input_folder))
+        assert sources == [
+            ArchiveMember(input_folder / "export.zip", "job-2/page.xliff"),
+            input_folder / "job-1" / "sub" / "nested.xlf",
+            input_folder / "top.xliff",
+        ]
+
+    def test_member_reads_without_extracting(self, input_folder):
+        member = ArchiveMember(input_folder / "export.zip", "job-2/page.xliff")
+        assert member.read_text(encoding="utf-8") == "<xliff>Kanzlei für Erbrecht</xliff>"
+        assert (member.name, member.stem, member.suffix, member.parent) == (
+            "page.xliff", "page", ".xliff", "job-2")
+        assert member.size == len("<xliff>Kanzlei für Erbrecht</xliff>".encode("utf-8"))
+        assert not (input_folder / "job-2").exists()
+
+    def test_member_is_picklable(self, input_folder):
+        member = ArchiveMember(input_folder / "export.zip", "job-2/page.xliff")
+        assert pickle.loads(pickle.dumps(member)) == member
+
+
+class TestOutputArchives:
+    """Test writing translated members straight into output archives."""
+
+    def test_write_and_close(self, input_folder, tmp_path):
+        member = ArchiveMember(input_folder / "export.zip", "job-2/page.xliff")
+        archives = OutputArchives(tmp_path / "out")
+        (tmp_path / "out").mkdir()
+        archives.write(member, "page_EN-US.xliff", "<xliff>Law firm</xliff>")
+        assert not (tmp_path / "out" / "export.zip").exists()
+        archives.close()
+        with zipfile.ZipFile(tmp_path / "out" / "export.zip") as archive:
+            assert archive.namelist() == ["job-2/page_EN-US.xliff"]
+            assert archive.read("job-2/page_EN-US.xliff").decode("utf-8") == "<xliff>Law firm</xliff>"
+
+    def test_same_named_archives_in_subfolders(self, tmp_path):
+        members = []
+        for job in ("a", "b"):
+            (tmp_path / "input" / job).mkdir(parents=True)
+            with zipfile.ZipFile(tmp_path / "input" / job / "site.zip", "w") as archive:
+                archive.writestr("page.xliff", "<xliff/>")
+            members.append(ArchiveMember(tmp_path / "input" / job / "site.zip", "page.xliff"))
+        archives = OutputArchives(tmp_path / "out", tmp_path / "input")
+        for member, text in zip(members, ("<xliff>a</xliff>", "<xliff>b</xliff>")):
+            archives.write(member, "page_EN-US.xliff", text)
+        archives.close()
+        for job in ("a", "b"):
+            with zipfile.ZipFile(tmp_path / "out" / job / "site.zip") as archive:
+                assert archive.read("page_EN-US.xliff").decode("utf-8") == f"<xliff>{job}</xliff>"
+
+    def test_abort_leaves_nothing(self, input_folder, tmp_path):
+        member = ArchiveMember(input_folder / "export.zip", "job-2/page.xliff")
+        archives = OutputArchives(tmp_path)
+        archives.write(member, "page_EN-US.xliff", "<xliff/>")
+        archives.abort()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["input"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
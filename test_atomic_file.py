@@ -0,0 +1,48 @@
+"""
+Test Suite for atomic_file.py
+==============================
+Run with: pytest test_atomic_file.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from atomic_file import open_atomic
+
+
+class TestOpenAtomic:
+    """Test temp-file-plus-rename writes."""
+
+    def test_writes_and_replaces(self, tmp_path):
+        target = tmp_path / "out.xliff"
+        target.write_text("alt", encoding="utf-8")
+        with open_atomic(target) as f:
+            f.write("<?xml version='1.0'?>")
+            f.write("<xliff/>")
+        assert target.read_text(encoding="utf-8") == "<?xml version='1.0'?><xliff/>"
+        assert os.listdir(tmp_path) == ["out.xliff"]
+
+    def test_error_keeps_previous_file(self, tmp_path):
+        target = tmp_path / "out.xliff"
+        target.write_text("alt", encoding="utf-8")
+        with pytest.raises(RuntimeError):
+            with open_atomic(target) as f:
+                f.write("<xliff>halb")
+                raise RuntimeError("crash")
+        assert target.read_text(encoding="utf-8") == "alt"
+        assert os.listdir(tmp_path) == ["out.xliff"]
+
+    def test_error_leaves_no_file(self, tmp_path):
+        target = tmp_path / "neu.xliff"
+        with pytest.raises(RuntimeError):
+            with open_atomic(target) as f:
+                f.write("<xliff>halb")
+                raise RuntimeError("crash")
+        assert os.listdir(tmp_path) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
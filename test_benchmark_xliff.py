@@ -0,0 +1,54 @@
+"""
+Test Suite for benchmark_xliff.py
+==================================
+Run with: pytest test_benchmark_xliff.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark_xliff
+import translate_xliff
+from test_translate_xliff import make_xliff
+
+
+class TestBenchmark:
+    """Test corpus scaling, stage timing and baseline comparison."""
+
+    def test_scale_document_unique_ids(self):
+        content = make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum")])
+        scaled = benchmark_xliff.scale_document(content, 3)
+        units = list(translate_xliff.iter_trans_units(scaled))
+        assert len(units) == 6
+        assert len({unit['id'] for unit in units}) == 6
+        assert benchmark_xliff.scale_document(content, 1) == content
+
+    def test_run_benchmarks(self):
+        documents = [("a.xliff", make_xliff([("Heading", "Unsere Kanzlei"), ("Id", "abc123")]))]
+        api = translate_xliff.TRANSLATION_API
+        results = benchmark_xliff.run_benchmarks(documents, scale=2, repeat=1)
+        assert list(results) == benchmark_xliff.STAGES
+        assert results['extract']['segments'] == 4
+        assert results['batch']['segments'] == 2
+        assert all(r['segments_per_s'] > 0 for r in results.values())
+        assert translate_xliff.TRANSLATION_API == api
+
+    def test_compare_to_baseline(self, tmp_path):
+        results = {
+            'skip@x1': {'segments_per_s': 700.0, 'mb_per_s': 1.0},
+            'write@x1': {'segments_per_s': 1000.0, 'mb_per_s': 1.0},
+        }
+        path = tmp_path / "baseline.json"
+        benchmark_xliff.save_baseline({'skip@x1': {'segments_per_s': 1000.0, 'mb_per_s': 1.0}}, path)
+        ratios, regressions = benchmark_xliff.compare_to_baseline(
+            results, benchmark_xliff.load_baseline(path), tolerance=0.25
+        )
+        assert ratios == {'skip@x1': pytest.approx(0.7)}
+        assert regressions == ['skip@x1']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,73 @@
+"""
+Test Suite for checkpoint_journal.py
+=====================================
+Run with: pytest test_checkpoint_journal.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from archive_io import ArchiveMember
+from checkpoint_journal import CheckpointJournal, hash_source_text
+
+
+class TestCheckpointJournal:
+    """Test the append-only per-file journal."""
+
+    def test_record_and_load(self, tmp_path):
+        source = tmp_path / "input" / "page.xliff"
+        journal = CheckpointJournal(source, tmp_path / ".journal", tmp_path / "input")
+        journal.record([("u1", "Kanzlei", "Law firm"), ("u2", "Notar", "Notary")], "EN-US")
+        journal.close()
+
+        loaded = CheckpointJournal(source, tmp_path / ".journal", tmp_path / "input").load("EN-US")
+        assert loaded == {
+            ("u1", hash_source_text("Kanzlei")): "Law firm",
+            ("u2", hash_source_text("Notar")): "Notary",
+        }
+
+    def test_same_name_in_other_folder_or_archive(self, tmp_path):
+        root = tmp_path / "input"
+        paths = {
+            CheckpointJournal(root / "a" / "page.xliff", tmp_path, root).path,
+            CheckpointJournal(root / "b" / "page.xliff", tmp_path, root).path,
+            CheckpointJournal(ArchiveMember(root / "site.zip", "page.xliff"), tmp_path, root).path,
+            CheckpointJournal(ArchiveMember(root / "site.zip", "de/page.xliff"), tmp_path, root).path,
+        }
+        assert len(paths) == 4
+        assert all(path.name.startswith("page.xliff.") for path in paths)
+
+    def test_other_language_ignored(self, tmp_path):
+        journal = CheckpointJournal("page.xliff", tmp_path)
+        journal.record([("u1", "Kanzlei", "Bufete")], "ES")
+        assert journal.load("EN-US") == {}
+
+    def test_torn_line_ignored(self, tmp_path):
+        journal = CheckpointJournal("page.xliff", tmp_path)
+        journal.record([("u1", "Kanzlei", "Law firm")], "EN-US")
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"id": "u2", "src": "ab')
+        assert len(journal.load("EN-US")) == 1
+
+    def test_remove(self, tmp_path):
+        journal = CheckpointJournal("page.xliff", tmp_path)
+        journal.record([("u1", "Kanzlei", "Law firm")], "EN-US")
+        journal.remove()
+        assert not journal.path.exists()
+        journal.remove()
+
+    def test_record_after_remove_is_ignored(self, tmp_path):
+        journal = CheckpointJournal("page.xliff", tmp_path)
+        journal.record([("u1", "Kanzlei", "Law firm")], "EN-US")
+        journal.remove()
+        # Callback batch yang dipakai bersama file lain, selesai belakangan
+        journal.record([("u2", "Notar", "Notary")], "EN-US")
+        assert not journal.path.exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,39 @@
+"""
+Test Suite for http_session.py
+===============================
+Run with: pytest test_http_session.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+requests = pytest.importorskip("requests")
+
+import http_session
+
+
+class TestSharedSession:
+    """Test the pooled keep-alive session."""
+    
+    def test_session_is_reused(self, monkeypatch):
+        monkeypatch.setattr(http_session, "_session", None)
+        first = http_session.get_http_session()
+        assert http_session.get_http_session() is first
+        http_session.close_http_session()
+        assert http_session.get_http_session() is not first
+        http_session.close_http_session()
+    
+    def test_pool_settings(self):
+        session = http_session.create_http_session(pool_maxsize=7)
+        adapter = session.get_adapter("https://translation.googleapis.com")
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 0
+        assert "gzip" in session.headers["Accept-Encoding"]
+        session.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,120 @@
+"""
+Test Suite for output_manifest.py
+==================================
+Run with: pytest test_output_manifest.py -v
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from output_manifest import OutputManifest, hash_content
+
+
+def write_output(manifest, filename, source_hash=None, target_lang="ES"):
+    path, _ = manifest.reserve(filename, source_hash, target_lang)
+    path.write_text("<xliff/>", encoding="utf-8")
+    manifest.commit(filename)
+    return path
+
+
+class TestBatchAllocation:
+    """Test batch folder allocation without directory scans."""
+    
+    def test_new_batch_when_full(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=2)
+        paths = [write_output(manifest, f"f{i}.xliff") for i in range(3)]
+        assert [p.parent.name for p in paths] == ["batch_1", "batch_1", "batch_2"]
+        manifest.close()
+    
+    def test_allocation_survives_reopen(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=2)
+        write_output(manifest, "a.xliff")
+        manifest.close()
+        
+        manifest = OutputManifest(tmp_path, files_per_batch=2)
+        path, created = manifest.reserve("b.xliff")
+        assert path.parent.name == "batch_1" and not created
+        manifest.close()
+    
+    def test_existing_outputs_are_indexed_once(self, tmp_path):
+        (tmp_path / "batch_3").mkdir()
+        (tmp_path / "batch_3" / "old.xliff").write_text("<xliff/>", encoding="utf-8")
+        (tmp_path / "legacy.xliff").write_text("<xliff/>", encoding="utf-8")
+        manifest = OutputManifest(tmp_path, files_per_batch=1)
+        assert manifest.find(["old.xliff"]) == tmp_path / "batch_3" / "old.xliff"
+        assert manifest.find(["legacy.xliff"]) == tmp_path / "legacy.xliff"
+        assert manifest.reserve("new.xliff")[0].parent.name == "batch_4"
+        manifest.close()
+    
+    def test_outputs_placed_later_are_indexed_on_open(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        write_output(manifest, "a.xliff")
+        manifest.close()
+        # Ditulis proses lain / dikembalikan manual setelah manifest ada
+        (tmp_path / "batch_1" / "restored.xliff").write_text("<xliff/>", encoding="utf-8")
+        (tmp_path / "root.xliff").write_text("<xliff/>", encoding="utf-8")
+        
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        assert manifest.find(["restored.xliff"]) == tmp_path / "batch_1" / "restored.xliff"
+        assert manifest.find(["root.xliff"]) == tmp_path / "root.xliff"
+        assert manifest.batch_outputs() == {1: ["a.xliff", "restored.xliff"]}
+        manifest.close()
+    
+    def test_unchanged_folders_are_not_listed(self, tmp_path, monkeypatch):
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        write_output(manifest, "a.xliff")
+        manifest.close()
+        old = time.time() - 60
+        os.utime(tmp_path / "batch_1", (old, old))
+        OutputManifest(tmp_path, files_per_batch=5).close()
+        
+        listed = []
+        iterdir = Path.iterdir
+        monkeypatch.setattr(Path, "iterdir", lambda self: listed.append(self.name) or iterdir(self))
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        assert listed == []
+        assert manifest.find(["a.xliff"]) == tmp_path / "batch_1" / "a.xliff"
+        manifest.close()
+
+
+class TestSkipLookup:
+    """Test the 'output already exists' lookup."""
+    
+    def test_find_by_filename_or_source(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        source_hash = hash_content("<xliff>job</xliff>")
+        path = write_output(manifest, "Title_job_ES.xliff", source_hash, "ES")
+        assert manifest.find(["Title_job_ES.xliff"]) == path
+        assert manifest.find(["renamed_ES.xliff"], source_hash, "ES") == path
+        assert manifest.find(["renamed_ES.xliff"], source_hash, "FR") is None
+        manifest.close()
+    
+    def test_deleted_output_is_forgotten(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        write_output(manifest, "a.xliff").unlink()
+        assert manifest.find(["a.xliff"]) is None
+        manifest.close()
+    
+    def test_interrupted_write_is_recovered(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        written, _ = manifest.reserve("written.xliff")
+        written.write_text("<xliff/>", encoding="utf-8")
+        manifest.reserve("lost.xliff")
+        manifest.close()  # proses mati sebelum commit
+        
+        manifest = OutputManifest(tmp_path, files_per_batch=5)
+        assert manifest.find(["written.xliff"]) == written
+        assert manifest.find(["lost.xliff"]) is None
+        manifest.close()
+    
+    def test_release_frees_the_slot(self, tmp_path):
+        manifest = OutputManifest(tmp_path, files_per_batch=1)
+        manifest.reserve("failed.xliff")
+        manifest.release("failed.xliff")
+        path, created = manifest.reserve("next.xliff")
+        assert path.parent.name == "batch_1"
+        manifest.close()
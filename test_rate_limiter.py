@@ -0,0 +1,95 @@
+"""
+Test Suite for rate_limiter.py
+===============================
+Run with: pytest test_rate_limiter.py -v
+"""
+
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limiter import (
+    RateLimiter,
+    parse_retry_after,
+    get_retry_after,
+    is_throttle_error,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} Error")
+        self.response = response
+
+
+class TestRateLimiter:
+    """Test token bucket and AIMD behaviour."""
+    
+    def test_burst_does_not_sleep(self):
+        limiter = RateLimiter(rate=1, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            assert limiter.acquire() == 0
+        assert time.monotonic() - start < 0.05
+    
+    def test_waits_when_bucket_empty(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        limiter.acquire()
+        assert limiter.acquire() > 0
+    
+    def test_additive_increase_is_capped(self):
+        limiter = RateLimiter(rate=1, max_rate=2, increase=0.5)
+        for _ in range(5):
+            limiter.on_success()
+        assert limiter.rate == 2
+    
+    def test_multiplicative_decrease_and_pause(self):
+        limiter = RateLimiter(rate=8, min_rate=1, decrease=0.5)
+        delay = limiter.on_throttle(0, retry_after=0.05)
+        assert delay == 0.05
+        assert limiter.rate == 4
+        assert limiter.acquire() > 0
+        for _ in range(5):
+            limiter.on_throttle(0, retry_after=0)
+        assert limiter.rate == 1
+    
+    def test_backoff_grows_and_is_capped(self):
+        limiter = RateLimiter(backoff_base=1, backoff_cap=8)
+        assert 0.5 <= limiter.backoff_delay(0) <= 1
+        assert 4 <= limiter.backoff_delay(3) <= 8
+        assert limiter.backoff_delay(10) <= 8
+
+
+class TestThrottleDetection:
+    """Test Retry-After parsing and throttle classification."""
+    
+    def test_parse_retry_after_seconds(self):
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("garbage") is None
+    
+    def test_parse_retry_after_http_date(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    
+    def test_is_throttle_error(self):
+        assert is_throttle_error(FakeHTTPError(FakeResponse(429)))
+        assert is_throttle_error(FakeHTTPError(FakeResponse(503)))
+        assert not is_throttle_error(FakeHTTPError(FakeResponse(400)))
+        assert is_throttle_error(Exception("Too many requests, DeepL servers busy"))
+    
+    def test_get_retry_after_from_response(self):
+        error = FakeHTTPError(FakeResponse(429, {'Retry-After': '3'}))
+        assert get_retry_after(error) == 3.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -16,6 +16,9 @@ Run with: pytest test_translate_xliff.py -v
 import pytest
 import sys
 import os
+import re
+import threading
+import time
 
 # Add the directory to path to import the module
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -49,6 +52,48 @@ from translate_xliff import (
     get_target_language_from_xliff,
     apply_post_translation_rules,
 )
+import translate_xliff
+import translation_backends
+from translation_memory import TranslationMemory
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def fast_rate_limiter(monkeypatch):
+    """Keep the shared rate limiter from pacing offline tests."""
+    limiter = RateLimiter(rate=1000, max_rate=1000, burst=1000, backoff_base=0.001)
+    monkeypatch.setattr(translate_xliff, "get_rate_limiter", lambda name: limiter)
+    return limiter
+
+
+def make_xliff(units, target_lang="en"):
+    """Build a minimal WPML-style XLIFF document from (resname, source) pairs."""
+    body = "".join(
+        f'<trans-unit resname="{resname}" id="u{i}"><source><![CDATA[{source}]]></source>'
+        f'<target state="needs-translation"><![CDATA[{source}]]></target></trans-unit>'
+        for i, (resname, source) in enumerate(units)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+        f'<xliff version="1.2"><file original="1-abc" source-language="de" target-language="{target_lang}">'
+        f'<body>{body}</body></file></xliff>'
+    )
+
+
+class FakeDeepLResult:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDeepLTranslator:
+    """Offline stand-in for deepl.Translator that records every request."""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def translate_text(self, texts, target_lang=None, tag_handling=None):
+        self.requests.append(list(texts))
+        return [FakeDeepLResult(f"EN:{t}") for t in texts]
 
 
 # ==================== TEST: SMART TITLE CASE ====================
@@ -644,6 +689,784 @@ class TestIntegration:
         assert result == "<![CDATA[Hello & World]]>"
 
 
+# ==================== TEST: TRANSLATION MEMORY ====================
+class TestTranslateBatchMemory:
+    """Test that translate_batch consults the Translation Memory first."""
+    
+    @pytest.fixture
+    def memory(self, tmp_path, monkeypatch):
+        tm = TranslationMemory(tmp_path / "tm.sqlite3")
+        monkeypatch.setattr(translate_xliff, "get_translation_memory", lambda: tm)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        yield tm
+        tm.close()
+    
+    def test_repeat_segments_skip_api(self, memory):
+        translator = FakeDeepLTranslator()
+        first = translate_xliff.translate_batch(translator, ["Kanzlei", "", "Notar"], "EN-US", "DE")
+        assert first == ["EN:Kanzlei", "", "EN:Notar"]
+        assert translator.requests == [["Kanzlei", "Notar"]]
+        
+        second = translate_xliff.translate_batch(translator, ["Notar", "Kanzlei", "Richter"], "EN-US", "DE")
+        assert second == ["EN:Notar", "EN:Kanzlei", "EN:Richter"]
+        assert translator.requests[-1] == ["Richter"]
+    
+    def test_fully_cached_batch_makes_no_request(self, memory):
+        translator = FakeDeepLTranslator()
+        translate_xliff.translate_batch(translator, ["Kanzlei"], "EN-US", "DE")
+        translate_xliff.translate_batch(translator, ["Kanzlei", "Kanzlei"], "EN-US", "DE")
+        assert len(translator.requests) == 1
+    
+    def test_target_language_is_part_of_key(self, memory):
+        translator = FakeDeepLTranslator()
+        translate_xliff.translate_batch(translator, ["Kanzlei"], "EN-US", "DE")
+        translate_xliff.translate_batch(translator, ["Kanzlei"], "ES", "DE")
+        assert len(translator.requests) == 2
+
+
+# ==================== TEST: CROSS-FILE DEDUPLICATION ====================
+class TestCrossFileDeduplication:
+    """Test the planning pass that translates each unique segment once."""
+    
+    @pytest.fixture(autouse=True)
+    def offline(self, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+    
+    def test_translate_texts_dedupes(self):
+        translator = FakeDeepLTranslator()
+        result = translate_xliff.translate_texts(translator, ["Kanzlei", "Notar", "Kanzlei"], "EN-US")
+        assert result == ["EN:Kanzlei", "EN:Notar", "EN:Kanzlei"]
+        assert translator.requests == [["Kanzlei", "Notar"]]
+    
+    def test_shared_segments_translated_once_per_language(self, tmp_path):
+        files = {
+            "a.xliff": make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Kontakt aufnehmen")]),
+            "b.xliff": make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum der Kanzlei")]),
+            "c.xliff": make_xliff([("Heading", "Unsere Kanzlei")], target_lang="es"),
+        }
+        plans = []
+        for name, content in files.items():
+            path = tmp_path / name
+            path.write_text(content, encoding="utf-8")
+            plans.append(translate_xliff.prepare_xliff_file(path))
+        
+        translator = FakeDeepLTranslator()
+        results = translate_xliff.translate_planned_files(translator, plans)
+        
+        sent = [text for request in translator.requests for text in request]
+        assert sent.count("Unsere Kanzlei") == 2  # once for EN-US, once for ES
+        assert sent.count("Kontakt aufnehmen") == 1
+        assert results[tmp_path / "a.xliff"] == ["EN:Unsere Kanzlei", "EN:Kontakt aufnehmen"]
+        assert results[tmp_path / "b.xliff"] == ["EN:Unsere Kanzlei", "EN:Impressum der Kanzlei"]
+        assert results[tmp_path / "c.xliff"] == ["EN:Unsere Kanzlei"]
+
+
+# ==================== TEST: CONCURRENT TRANSLATION ====================
+class TestConcurrentTranslation:
+    """Test the bounded thread-pool dispatch in translate_texts."""
+    
+    class SlowTranslator(FakeDeepLTranslator):
+        def __init__(self):
+            super().__init__()
+            self.active = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+        
+        def translate_text(self, texts, target_lang=None, tag_handling=None):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.02)
+            with self.lock:
+                self.active -= 1
+            return super().translate_text(texts, target_lang, tag_handling)
+    
+    @pytest.fixture(autouse=True)
+    def offline(self, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setitem(translate_xliff.TRANSLATION_BACKENDS, "deepl",
+                            dict(translate_xliff.TRANSLATION_BACKENDS["deepl"], max_segments=2))
+        monkeypatch.setattr(translate_xliff, "MAX_CONCURRENT_REQUESTS", 3)
+        monkeypatch.setattr(translate_xliff, "_translation_executor", None)
+    
+    def test_results_in_order_with_bounded_concurrency(self):
+        translator = self.SlowTranslator()
+        texts = [f"Satz {i}" for i in range(20)]
+        result = translate_xliff.translate_texts(translator, texts, "EN-US")
+        assert result == [f"EN:Satz {i}" for i in range(20)]
+        assert len(translator.requests) == 10
+        assert 1 < translator.peak <= 3
+    
+    def test_quota_error_propagates(self):
+        class QuotaTranslator(FakeDeepLTranslator):
+            def translate_text(self, texts, target_lang=None, tag_handling=None):
+                raise Exception("Quota exceeded")
+        
+        with pytest.raises(Exception, match="Quota"):
+            translate_xliff.translate_texts(QuotaTranslator(), ["Eins", "Zwei", "Drei"], "EN-US")
+
+
+# ==================== TEST: PROVIDER-SIZED BATCHING ====================
+class TestProviderBatching:
+    """Test batching by provider limits and splitting of oversized segments."""
+    
+    LIMITS = {'max_segments': 3, 'max_chars': 40, 'max_request_bytes': 1000, 'payload': 'json'}
+    
+    def test_batches_respect_segment_and_char_limits(self):
+        texts = ["a" * 10, "b" * 10, "c" * 10, "d" * 10, "e" * 25, "f" * 20]
+        batches = translate_xliff.build_translation_batches(texts, self.LIMITS)
+        assert [len(b) for b in batches] == [3, 2, 1]
+        for batch in batches:
+            assert len(batch) <= 3
+            assert sum(len(t) for t in batch) <= 40
+    
+    def test_batches_respect_byte_limit(self):
+        limits = dict(self.LIMITS, max_chars=10000, max_request_bytes=40)
+        batches = translate_xliff.build_translation_batches(["ü" * 5, "ü" * 5], limits)
+        assert len(batches) == 2  # each ü costs 6 bytes as JSON escape
+    
+    def test_split_oversized_segment_at_safe_boundaries(self):
+        text = '<p>Erster Satz hier.</p><p>Zweiter <a href="https://ra-cocron.de/x y">Satz</a> dort.</p>'
+        pieces = translate_xliff.split_oversized_segment(text, lambda p: len(p) <= 40)
+        assert "".join(pieces) == text
+        assert all(len(p) <= 40 for p in pieces)
+        for piece in pieces:
+            assert piece.count("<") == piece.count(">")
+    
+    def test_oversized_segment_round_trip(self, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setitem(translate_xliff.TRANSLATION_BACKENDS, "deepl",
+                            dict(translate_xliff.TRANSLATION_BACKENDS["deepl"],
+                                 **dict(self.LIMITS, max_chars=30, payload='form')))
+        translator = FakeDeepLTranslator()
+        text = "Erster Satz ist hier. Zweiter Satz ist dort. Dritter Satz."
+        result = translate_xliff.translate_texts(translator, [text], "EN-US")
+        sent = [t for request in translator.requests for t in request]
+        assert all(len(t) <= 30 for t in sent)
+        assert result[0].replace("EN:", "") == text
+    
+    def test_google_sends_one_request_per_batch(self, monkeypatch):
+        calls = []
+        
+        class FakeResponse:
+            def __init__(self, texts):
+                self.texts = texts
+            def raise_for_status(self):
+                pass
+            def json(self):
+                return {'data': {'translations': [{'translatedText': f"EN:{t}"} for t in self.texts]}}
+        
+        class FakeSession:
+            def post(self, url, json=None, timeout=None, **kwargs):
+                assert timeout is not None
+                calls.append(json)
+                return FakeResponse(json["q"])
+        
+        session = FakeSession()
+        monkeypatch.setattr(translation_backends, "get_http_session", lambda: session)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "google")
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        
+        client = translation_backends.get_backend("google")["connect"]("test-key")
+        result = translate_xliff.translate_batch(client, ["Eins", "", "Zwei &amp; Drei"], "EN-US")
+        assert len(calls) == 1
+        assert calls[0]["q"] == ["Eins", "Zwei &amp; Drei"]
+        assert result == ["EN:Eins", "", "EN:Zwei & Drei"]
+
+
+# ==================== TEST: ADAPTIVE RATE LIMITING ====================
+class TestThrottleRetry:
+    """Test that throttled batches are retried instead of failing or recursing."""
+    
+    class ThrottledError(Exception):
+        http_status_code = 429
+    
+    def test_retry_after_throttle(self, monkeypatch, fast_rate_limiter):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        error = self.ThrottledError("Too many requests")
+        
+        class FlakyTranslator(FakeDeepLTranslator):
+            def translate_text(self, texts, target_lang=None, tag_handling=None):
+                if not self.requests:
+                    self.requests.append(None)
+                    raise error
+                return super().translate_text(texts, target_lang, tag_handling)
+        
+        translator = FlakyTranslator()
+        result = translate_xliff.translate_batch(translator, ["Kanzlei"], "EN-US")
+        assert result == ["EN:Kanzlei"]
+        assert fast_rate_limiter.throttle_count == 1
+
+
+# ==================== TEST: LINEAR TRANS-UNIT TOKENIZER ====================
+class TestIterTransUnits:
+    """Test the streaming trans-unit tokenizer."""
+    
+    def test_records_and_offsets(self):
+        content = make_xliff([("title", "Kanzlei Cocron"), ("text_1", "Erbrecht &amp; Familie")])
+        units = list(translate_xliff.iter_trans_units(content))
+        assert [u['resname'] for u in units] == ["title", "text_1"]
+        assert [u['id'] for u in units] == ["u0", "u1"]
+        assert units[0]['source_text'] == "Kanzlei Cocron"
+        assert units[0]['is_cdata'] is True
+        for unit in units:
+            element = content[unit['target_start']:unit['target_end']]
+            assert element == unit['target_tag'] + unit['target_raw'] + "</target>"
+    
+    def test_unit_without_target_does_not_bleed(self):
+        content = (
+            '<xliff><body>'
+            '<trans-unit resname="a" id="1"><source>Ohne Ziel</source></trans-unit>'
+            '<trans-unit resname="b" id="2"><source>Mit Ziel</source><target>Mit Ziel</target></trans-unit>'
+            '</body></xliff>'
+        )
+        units = list(translate_xliff.iter_trans_units(content))
+        assert len(units) == 1
+        assert units[0]['resname'] == "b"
+        assert units[0]['source_text'] == "Mit Ziel"
+    
+    def test_large_document_is_linear(self):
+        class ScanCountingStr(str):
+            """Counts the characters every find() call scans."""
+            scanned = 0
+
+            def find(self, sub, start=0, end=None):
+                end = len(self) if end is None else end
+                index = str.find(self, sub, start, end)
+                ScanCountingStr.scanned += (end if index == -1 else index + len(sub)) - start
+                return index
+
+        broken = ScanCountingStr(
+            '<trans-unit resname="x" id="1"><source>Text ohne Ziel</source></trans-unit>' * 20000)
+        assert list(translate_xliff.iter_trans_units(broken)) == []
+        # Linear: setiap karakter di-scan beberapa kali saja, tidak sampai akhir dokumen per unit
+        assert ScanCountingStr.scanned < 3 * len(broken)
+
+
+# ==================== TEST: COMPILED SKIP RULES ====================
+class TestCompiledRuleTables:
+    """Test the fused rule tables against the plain per-pattern loop."""
+    
+    SAMPLES = [
+        "Team Parent", "post_parent", "Bild Image Url", "Html", "Classic Block",
+        "Cocron Rechtsanwalt Text", "brx-header", "x_jet_engine_y", "Icon Fill Id",
+        "Children Anwälte 2", "Line one\nSome Parent", "Kanzlei", "",
+    ]
+    
+    @pytest.mark.parametrize("patterns,flags,search", [
+        (translate_xliff.WP_ADMIN_PROTECTED_PATTERNS, re.IGNORECASE, True),
+        (translate_xliff.SKIP_RESNAME_PATTERNS, re.IGNORECASE, False),
+        (translate_xliff.PARENT_CHILD_PATTERNS, re.IGNORECASE, False),
+        (translate_xliff.SKIP_TECHNICAL_PATTERNS, 0, True),
+    ])
+    def test_same_answer_as_loop(self, patterns, flags, search):
+        table = translate_xliff.compile_rule_table(patterns, flags, search=search)
+        find = re.search if search else re.match
+        for text in self.SAMPLES:
+            expected = next((p for p in patterns if find(p, text, flags)), None)
+            assert translate_xliff.match_rule(table, text) == expected, text
+    
+    def test_block_keywords_keep_priority(self):
+        # 'accordion' is listed before 'heading'
+        assert detect_wordpress_block_type("Accordion Heading", "Text") == ('accordion', True)
+        assert detect_wordpress_block_type("Sektion:::Id", "x") == ('section_visibility', False)
+        assert detect_wordpress_block_type("Unbekannt", "x") == ('unknown', True)
+    
+    def test_skip_decision_reports_rule(self):
+        assert translate_xliff.get_skip_decision("Bild Image Url", "Bild der Kanzlei") == \
+            (True, r'resname:.*\bUrl$')
+        assert translate_xliff.get_skip_decision("Heading", "Kanzlei für Erbrecht") == \
+            (False, 'block:heading')
+        assert translate_xliff.get_skip_decision("Text", "   ") == (True, 'empty')
+
+
+# ==================== TEST: COMPILED REPLACEMENT PLANS ====================
+class TestReplacementPlans:
+    """Test the per-language replacement stages keep sequential precedence."""
+    
+    def test_earlier_entry_wins_at_same_position(self):
+        # 'sachsen' is listed before 'sachsen-anhalt' and used to be applied first
+        result = apply_post_translation_rules("Kanzlei in sachsen-anhalt", "x", target_lang="EN-US")
+        assert "Saxony-anhalt" in result
+    
+    def test_overlapping_job_titles_all_apply(self):
+        result = apply_post_translation_rules("specialist attorney at law", "x", target_lang="EN-US")
+        assert result == "Specialist Attorney at Law"
+    
+    def test_places_and_city_caps(self):
+        assert apply_post_translation_rules("Büro in münchen und wien", "x", target_lang="ES") == \
+            "Büro in Múnich und Viena"
+        assert translate_xliff.fix_city_capitalization("from köln to prague", "EN-GB") == \
+            "from Cologne to Prague"
+    
+    def test_plan_is_cached(self):
+        assert translate_xliff.get_replacement_plan("EN") is translate_xliff.get_replacement_plan("EN")
+    
+    def test_unknown_language_untouched(self):
+        assert translate_xliff.fix_city_capitalization("münchen", "FR") == "münchen"
+
+
+# ==================== TEST: SINGLE-PASS CLASSIFICATION ====================
+class TestClassifyTransUnit:
+    """Test that each unit is classified once into a reusable record."""
+    
+    def test_record_fields(self):
+        content = make_xliff([("Heading", "Kanzlei für Erbrecht"), ("Email", "info@ra-cocron.de")])
+        heading, email = [translate_xliff.classify_trans_unit(u)
+                          for u in translate_xliff.iter_trans_units(content)]
+        assert heading['skip'] is False
+        assert heading['skip_reason'] == 'block:heading'
+        assert heading['block_type'] == 'heading'
+        assert heading['restore'] is False
+        assert email['skip'] is True
+        assert email['restore'] is True
+    
+    def test_classified_once_per_unit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path))
+        calls = []
+        original = translate_xliff.get_skip_decision
+        monkeypatch.setattr(translate_xliff, "get_skip_decision",
+                            lambda r, t: calls.append(r) or original(r, t))
+        source = tmp_path / "page.xliff"
+        source.write_text(make_xliff([("Heading", "Kanzlei für Erbrecht"), ("Id", "abc123")]),
+                          encoding="utf-8")
+        
+        plan = translate_xliff.prepare_xliff_file(source)
+        translate_xliff.finalize_xliff_file(plan, ["Law firm for inheritance law"])
+        assert calls == ["Heading", "Id"]
+
+
+# ==================== TEST: OFFLINE PSEUDO BACKEND ====================
+class TestPseudoBackend:
+    """Test the full pipeline offline with the pseudo-translation backend."""
+    
+    def test_process_file_end_to_end(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "pseudo")
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path / "out"))
+        os.makedirs(tmp_path / "out")
+        source = tmp_path / "page.xliff"
+        source.write_text(make_xliff([
+            ("title", "Kanzlei für Erbrecht"),
+            ("text_block", '<p>Besuchen Sie <a href="https://ra-cocron.de">uns</a></p>'),
+        ]), encoding="utf-8")
+        
+        translator = translate_xliff.connect_backend("pseudo")
+        assert translate_xliff.process_xliff_file_regex(translator, source) == 2
+        
+        [output_path] = (tmp_path / "out").glob("*.xliff")
+        output = output_path.read_text(encoding="utf-8")
+        assert "⟦" in output
+        assert 'href="https://ra-cocron.de"' in output
+        assert validate_xliff_structure(output)[0]
+
+
+# ==================== TEST: STAGED PIPELINE ====================
+class TestStagedPipeline:
+    """Test the parse -> translate -> write pipeline over several files."""
+
+    @pytest.fixture
+    def files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path / "out"))
+        monkeypatch.setattr(translate_xliff, "PIPELINE_PREFETCH", 2)
+        monkeypatch.setattr(translate_xliff, "JOURNAL_FOLDER", str(tmp_path / ".journal"))
+        os.makedirs(tmp_path / "out")
+        paths = []
+        for i, text in enumerate(["Unsere Kanzlei", "Kontakt aufnehmen", "Unsere Kanzlei", "Impressum der Kanzlei"]):
+            path = tmp_path / f"page{i}.xliff"
+            path.write_text(make_xliff([("Heading", text), ("Id", "abc123")]), encoding="utf-8")
+            paths.append(path)
+        (tmp_path / "kaputt.xliff").write_text("<xliff></xliff>", encoding="utf-8")
+        paths.insert(2, tmp_path / "kaputt.xliff")
+        return paths
+
+    def test_inline_yields_in_order(self, files, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 0)
+        translator = FakeDeepLTranslator()
+        results = list(translate_xliff.run_pipeline(translator, files))
+
+        assert [path for path, _ in results] == files
+        assert [segments for _, segments in results] == [1, 1, 0, 1, 1]
+        sent = [text for request in translator.requests for text in request]
+        assert sent.count("Unsere Kanzlei") == 1
+        assert len(list((tmp_path / "out").glob("*.xliff"))) == 4
+
+    def test_worker_processes(self, files, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 2)
+        results = list(translate_xliff.run_pipeline(FakeDeepLTranslator(), files))
+
+        assert [segments for _, segments in results] == [1, 1, 0, 1, 1]
+        outputs = sorted((tmp_path / "out").glob("*.xliff"))
+        assert len(outputs) == 4
+        assert "Law Firm" in outputs[0].read_text(encoding="utf-8")
+
+
+    def test_zip_members_written_to_output_archive(self, tmp_path, monkeypatch):
+        import zipfile
+        from archive_io import iter_xliff_sources
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 0)
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path / "out"))
+        monkeypatch.setattr(translate_xliff, "JOURNAL_FOLDER", str(tmp_path / ".journal"))
+        os.makedirs(tmp_path / "out")
+        os.makedirs(tmp_path / "in")
+        with zipfile.ZipFile(tmp_path / "in" / "export.zip", "w") as archive:
+            archive.writestr("job/a.xliff", make_xliff([("Heading", "Unsere Kanzlei")]))
+            archive.writestr("job/b.xliff", make_xliff([("Heading", "Impressum der Kanzlei")]))
+
+        sources = list(iter_xliff_sources(tmp_path / "in"))
+        results = list(translate_xliff.run_pipeline(FakeDeepLTranslator(), sources))
+
+        assert [segments for _, segments in results] == [1, 1]
+        with zipfile.ZipFile(tmp_path / "out" / "export.zip") as archive:
+            assert archive.namelist() == ["job/a_EN-US.xliff", "job/b_EN-US.xliff"]
+            assert 'state="translated"' in archive.read("job/a_EN-US.xliff").decode("utf-8")
+
+
+# ==================== TEST: CHECKPOINT JOURNAL ====================
+class TestCheckpointResume:
+    """Test that a run stopped mid-file resumes from the journal."""
+
+    class QuotaTranslator(FakeDeepLTranslator):
+        def translate_text(self, texts, target_lang=None, tag_handling=None):
+            if "Impressum der Kanzlei" in texts:
+                raise Exception("Quota exceeded")
+            return super().translate_text(texts, target_lang, tag_handling)
+
+    def test_resume_after_quota_error(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 0)
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path / "out"))
+        monkeypatch.setattr(translate_xliff, "JOURNAL_FOLDER", str(tmp_path / ".journal"))
+        monkeypatch.setitem(translate_xliff.TRANSLATION_BACKENDS, "deepl",
+                            dict(translate_xliff.TRANSLATION_BACKENDS["deepl"], max_segments=1))
+        os.makedirs(tmp_path / "out")
+        source = tmp_path / "page.xliff"
+        source.write_text(make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum der Kanzlei")]),
+                          encoding="utf-8")
+
+        with pytest.raises(Exception, match="Quota"):
+            list(translate_xliff.run_pipeline(self.QuotaTranslator(), [source]))
+        assert list((tmp_path / "out").iterdir()) == []
+        assert list((tmp_path / ".journal").glob("page.xliff.*.jsonl"))
+
+        translator = FakeDeepLTranslator()
+        assert list(translate_xliff.run_pipeline(translator, [source])) == [(source, 2)]
+        assert translator.requests == [["Impressum der Kanzlei"]]
+        assert not list((tmp_path / ".journal").glob("page.xliff.*.jsonl"))
+
+
+# ==================== TEST: INCREMENTAL RE-TRANSLATION ====================
+class TestIncremental:
+    """Test that only new or changed units are sent when a previous output exists."""
+
+    def test_only_changed_units_are_sent(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "USE_CHECKPOINT_JOURNAL", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 0)
+        monkeypatch.setattr(translate_xliff, "OUTPUT_FOLDER", str(tmp_path / "out"))
+        os.makedirs(tmp_path / "out")
+        source = tmp_path / "page.xliff"
+        source.write_text(make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum der Kanzlei")]),
+                          encoding="utf-8")
+        list(translate_xliff.run_pipeline(FakeDeepLTranslator(), [source]))
+        (output,) = (tmp_path / "out").iterdir()
+        # Reviewer memperbaiki terjemahan di output
+        reviewed = output.read_text(encoding="utf-8").replace("Law Firm", "Our Firm")
+        output.write_text(reviewed, encoding="utf-8")
+
+        source.write_text(make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum der neuen Kanzlei")]),
+                          encoding="utf-8")
+        monkeypatch.setattr(translate_xliff, "INCREMENTAL", True)
+        translator = FakeDeepLTranslator()
+        assert list(translate_xliff.run_pipeline(translator, [source])) == [(source, 2)]
+        assert translator.requests == [["Impressum der neuen Kanzlei"]]
+        content = output.read_text(encoding="utf-8")
+        assert "Our Firm" in content
+        assert "neuen Kanzlei" in content
+
+    def test_previous_index_uses_output_language(self, tmp_path):
+        (tmp_path / "page_1_ES.xliff").write_text(make_xliff([("Heading", "Hallo")]), encoding="utf-8")
+        (tmp_path / "page.xliff").write_text(make_xliff([("Heading", "Hallo")]), encoding="utf-8")
+        index = translate_xliff.build_previous_output_index(str(tmp_path))
+        assert list(index) == [("1-abc", "ES")]
+
+
+# ==================== TEST: COST ESTIMATE ====================
+class TestCostEstimate:
+    """Test the dry-run billable character count and the budget gate."""
+
+    @pytest.fixture
+    def files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "JOURNAL_FOLDER", str(tmp_path / ".journal"))
+        a = tmp_path / "a.xliff"
+        a.write_text(make_xliff([("Heading", "Unsere Kanzlei"), ("Id", "abc123")]).replace(
+            '<file ', '<file tool:wpml-words-to-translate-count="2" ', 1), encoding="utf-8")
+        b = tmp_path / "b.xliff"
+        b.write_text(make_xliff([("Heading", "Unsere Kanzlei"), ("Text", "Impressum")], target_lang="es"),
+                     encoding="utf-8")
+        c = tmp_path / "c.xliff"
+        c.write_text(make_xliff([("Heading", "Unsere Kanzlei")]), encoding="utf-8")
+        return [a, b, c]
+
+    def test_billable_characters(self, files):
+        report = translate_xliff.estimate_run_cost(files)
+        assert set(report['totals']) == {'deepl', 'google'}
+        a, b, c = report['files']
+        assert a['chars']['deepl'] == len("Unsere Kanzlei")
+        assert a['words'] == 2 and a['wpml_words'] == 2
+        assert b['chars']['deepl'] == len("Unsere Kanzlei") + len("Impressum")
+        assert c['wpml_words'] is None
+        # Segment yang sama di file lain dengan bahasa sama hanya ditagih sekali
+        assert report['languages']['EN-US']['deepl'] == len("Unsere Kanzlei")
+        assert report['totals']['google'] == 2 * len("Unsere Kanzlei") + len("Impressum")
+
+    def test_budget_gate(self, files, monkeypatch):
+        report = translate_xliff.estimate_run_cost(files, backend_names=["deepl"])
+        monkeypatch.setattr(translate_xliff, "CHARACTER_BUDGET", 30)
+        assert translate_xliff.check_character_budget(report, "deepl") is False
+        monkeypatch.setattr(translate_xliff, "CHARACTER_BUDGET", 100)
+        assert translate_xliff.check_character_budget(report, "deepl") is True
+
+    def test_remaining_quota_gate(self, files, monkeypatch):
+        report = translate_xliff.estimate_run_cost(files, backend_names=["deepl"])
+        monkeypatch.setitem(translate_xliff.TRANSLATION_BACKENDS, "deepl",
+                            dict(translate_xliff.TRANSLATION_BACKENDS["deepl"], usage=lambda t: (499990, 500000)))
+        assert translate_xliff.check_character_budget(report, "deepl", translator=object()) is False
+
+    def test_gate_skips_estimate_with_ample_quota(self, files, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        estimates = []
+        estimate = translate_xliff.estimate_run_cost
+        monkeypatch.setattr(translate_xliff, "estimate_run_cost",
+                            lambda *args: estimates.append(args) or estimate(*args))
+        quota = {"used": 0}
+        monkeypatch.setitem(translate_xliff.TRANSLATION_BACKENDS, "deepl",
+                            dict(translate_xliff.TRANSLATION_BACKENDS["deepl"],
+                                 usage=lambda t: (quota["used"], 500000)))
+        assert translate_xliff.passes_budget_gate(object(), files, None) is True
+        assert estimates == []
+        # Kuota hampir habis: estimasi lengkap dijalankan
+        quota["used"] = 500000 - 20
+        assert translate_xliff.passes_budget_gate(object(), files, None) is False
+        assert len(estimates) == 1
+
+
+# ==================== TEST: PROFILING & PERF COUNTERS ====================
+class TestPerfCounters:
+    """Test the always-on hot-path counters and the --profile report."""
+
+    def test_counters_collected(self, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "PERF_COUNTERS", translate_xliff.Counter())
+        should_skip_translation("Heading", "Unsere Kanzlei")
+        apply_post_translation_rules("our law firm in munich", "Unsere Kanzlei in München", target_lang="EN-US")
+        counters = translate_xliff.PERF_COUNTERS
+        assert counters['skip_decisions'] == 1
+        assert counters['rule_regex_calls'] > 0
+        assert counters['post_rules_calls'] == 1
+        assert counters['replacement_chars'] > 0
+
+    def test_profile_run(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", None)
+        os.makedirs("input")
+        (tmp_path / "input" / "page.xliff").write_text(
+            make_xliff([("Heading", "Unsere Kanzlei")]), encoding="utf-8")
+
+        translate_xliff.main(["--backend", "pseudo", "--profile"])
+
+        report = (tmp_path / translate_xliff.PROFILE_REPORT).read_text(encoding="utf-8")
+        assert "HOTSPOTS" in report
+        assert "page.xliff" in report.split("PEAK MEMORY PER FILE")[1]
+        assert "API" in report.split("PERF COUNTERS")[1]
+        assert len(list((tmp_path / "output").glob("*.xliff"))) == 1
+
+
+# ==================== TEST: WATCH MODE ====================
+class TestWatchMode:
+    """Test the watch-folder daemon."""
+
+    def test_poll_waits_until_file_is_stable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "INPUT_FOLDER", str(tmp_path))
+        monkeypatch.setattr(translate_xliff, "WATCH_SETTLE_SECONDS", 0)
+        source = tmp_path / "job" / "page.xliff"
+        source.parent.mkdir()
+        source.write_text("<xliff>", encoding="utf-8")
+        signatures = {}
+        assert translate_xliff.poll_input_folder(signatures) == []
+        source.write_text("<xliff></xliff>", encoding="utf-8")  # masih di-copy
+        assert translate_xliff.poll_input_folder(signatures) == []
+        assert translate_xliff.poll_input_folder(signatures) == [source]
+
+    def test_new_files_are_translated(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(translate_xliff, "USE_TRANSLATION_MEMORY", False)
+        monkeypatch.setattr(translate_xliff, "MAX_WORKER_PROCESSES", 0)
+        monkeypatch.setattr(translate_xliff, "WATCH_SETTLE_SECONDS", 0)
+        os.makedirs("input")
+        polls = []
+
+        def fake_sleep(seconds):
+            polls.append(seconds)
+            if len(polls) == 1:
+                (tmp_path / "input" / "page.xliff").write_text(
+                    make_xliff([("Heading", "Unsere Kanzlei")]), encoding="utf-8")
+            elif len(polls) == 4:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(translate_xliff.time, "sleep", fake_sleep)
+        translate_xliff.main(["--backend", "pseudo", "--watch"])
+
+        assert len(list((tmp_path / "output").glob("*.xliff"))) == 1
+        assert not (tmp_path / "input" / "page.xliff").exists()
+
+    def test_broken_pool_is_recreated(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(translate_xliff, "WATCH_SETTLE_SECONDS", 0)
+        os.makedirs("input")
+        (tmp_path / "input" / "page.xliff").write_text(make_xliff([("Heading", "Unsere Kanzlei")]),
+                                                       encoding="utf-8")
+
+        class FakePool:
+            def shutdown(self, wait=True, cancel_futures=False):
+                self.closed = True
+
+        pools, used, sleeps = [], [], []
+
+        def create_pool():
+            pools.append(FakePool())
+            return pools[-1]
+
+        def translate(translator, xliff_files, target_lang_override, pool):
+            used.append(pool)
+            if len(used) == 1:
+                raise translate_xliff.BrokenProcessPool("worker died")
+            return 1, 1
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(used) == 1 and len(sleeps) == 2:
+                # File berubah setelah gagal, jadi dicoba lagi
+                (tmp_path / "input" / "page.xliff").write_text(make_xliff([("Heading", "Impressum")]),
+                                                               encoding="utf-8")
+            elif len(used) == 2 or len(sleeps) > 10:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(translate_xliff, "create_worker_pool", create_pool)
+        monkeypatch.setattr(translate_xliff, "translate_and_cleanup", translate)
+        monkeypatch.setattr(translate_xliff.time, "sleep", fake_sleep)
+        translate_xliff.main(["--backend", "pseudo", "--watch"])
+
+        assert len(pools) == 2 and pools[0].closed
+        assert used == pools
+
+
+# ==================== TEST: RESNAME CACHE ====================
+class TestResnameCache:
+    """Test that resname-only skip rules are derived once per resname."""
+
+    def test_resname_rules_cached(self):
+        translate_xliff.classify_resname.cache_clear()
+        for text in ("Unsere Kanzlei", "https://ra-cocron.de/", "true"):
+            should_skip_translation("Bricks Page Content 2 0 0 Id", text)
+        info = translate_xliff.classify_resname.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+    def test_decisions_still_depend_on_content(self):
+        resname = "Bricks Page Content 2 0 0 Accordion Item Text"
+        assert should_skip_translation(resname, "Unsere Kanzlei") is False
+        assert should_skip_translation(resname, "true") is True
+        assert should_skip_translation("Settings Attribute Value", "{je_phone}") is True
+        assert should_skip_translation("Settings Attribute Value", "Rufen Sie uns an") is False
+
+
+# ==================== TEST: MARKUP MASKING ====================
+class TestMarkupMasking:
+    """Test placeholder masking of inline markup before API requests."""
+
+    TEXT = ('Mehr <strong class="cr-text-highlight">Recht</strong> bei der '
+            '<a href="https://ra-cocron.de/rechtsgebiete/zwangsversteigerung/">ZVG</a> {je_contact_phone}')
+
+    def test_round_trip_and_shorter(self):
+        masked, mapping = translate_xliff.mask_inline_markup(self.TEXT)
+        assert masked == 'Mehr <strong m="1">Recht</strong> bei der <a m="2"><t m="3"/></a> <t m="4"/>'
+        assert translate_xliff.unmask_inline_markup(masked, mapping) == self.TEXT
+
+    def test_plain_text_untouched(self):
+        assert translate_xliff.mask_inline_markup("Unsere Kanzlei <br>") == ("Unsere Kanzlei <br>", {})
+
+    def test_parity_failure(self):
+        masked, mapping = translate_xliff.mask_inline_markup(self.TEXT)
+        assert translate_xliff.unmask_inline_markup(masked.replace('<t m="4"/>', ''), mapping) is None
+        assert translate_xliff.unmask_inline_markup(masked + '<t m="4"/>', mapping) is None
+        # Pasangan placeholder ditulis ulang sebagai tag bersarang: </t> liar tersisa
+        nested = 'Contact <t m="1"> now <t m="2"></t></t>'
+        assert translate_xliff.unmask_inline_markup(nested, {"1": "{a}", "2": "{b}"}) is None
+        assert translate_xliff.unmask_inline_markup(masked.replace('m="4"/>', 'm="4"/> <t m=4'), mapping) is None
+        # Google menulis ulang void tag
+        rewritten = masked.replace('<t m="4"/>', '<t m="4"></t>')
+        assert translate_xliff.unmask_inline_markup(rewritten, mapping) == self.TEXT
+
+    def test_fallback_without_masking(self, monkeypatch):
+        monkeypatch.setattr(translate_xliff, "TRANSLATION_API", "deepl")
+        sent = []
+
+        class DroppingTranslator(FakeDeepLTranslator):
+            def translate_text(self, texts, target_lang=None, tag_handling=None):
+                sent.append(list(texts))
+                return [FakeDeepLResult(re.sub(r'<t m="\d+"/>', '', t)) for t in texts]
+
+        result = translate_xliff.request_masked_translations(DroppingTranslator(), [self.TEXT, "Hallo"], "EN-US")
+        assert sent[1] == [self.TEXT]
+        assert result == [self.TEXT, "Hallo"]
+
+    def test_estimate_counts_masked_characters(self):
+        masked, _ = translate_xliff.mask_inline_markup(self.TEXT)
+        assert translate_xliff.billable_length(self.TEXT, "deepl") == len(masked) < len(self.TEXT)
+
+
+# ==================== TEST: STARTUP ====================
+class TestStartup:
+    """Test that importing the module stays cheap."""
+
+    # Jumlah self-time (-X importtime) modul repo ini; saat ini ~30 ms, batas longgar agar tidak flaky
+    IMPORT_BUDGET_SECONDS = 0.5
+
+    def test_import_is_fast_and_lazy(self):
+        import subprocess
+        repo = os.path.dirname(os.path.abspath(__file__))
+        code = (
+            "import sys; import translate_xliff; "
+            "print(sorted(m for m in ('deepl', 'requests', 'cProfile') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                capture_output=True, text=True, check=True, cwd=repo)
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+        # Hanya modul milik repo: waktu import stdlib tergantung mesin dan cache
+        own_modules = {name[:-3] for name in os.listdir(repo) if name.endswith(".py")}
+        self_us = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_time, _, name = line[len("import time:"):].split("|")
+            if name.strip() in own_modules:
+                self_us += int(self_time)
+        assert 0 < self_us / 1_000_000 < self.IMPORT_BUDGET_SECONDS
+
+
 # ==================== MAIN ====================
 if __name__ == "__main__":
     # Run with verbose output
@@ -0,0 +1,89 @@
+"""
+Test Suite for translate_xliff_google.py (batch folders & zip packaging)
+=========================================================================
+Run with: pytest test_translate_xliff_google.py -v
+"""
+
+import pytest
+import sys
+import os
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import translate_xliff_google
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    monkeypatch.setattr(translate_xliff_google, "OUTPUT_FOLDER", str(tmp_path))
+    monkeypatch.setattr(translate_xliff_google, "FILES_PER_BATCH", 2)
+    monkeypatch.setattr(translate_xliff_google, "ZIP_WORKERS", 0)
+    monkeypatch.setattr(translate_xliff_google, "_manifest", None)
+    manifest = translate_xliff_google.get_output_manifest()
+    yield tmp_path, manifest
+    translate_xliff_google.close_output_manifest()
+
+
+def add_output(manifest, name, text="<xliff/>"):
+    path, _ = manifest.reserve(name)
+    path.write_text(text, encoding="utf-8")
+    manifest.commit(name)
+    return path
+
+
+class TestZipPackaging:
+    """Test incremental batch_N.zip packaging driven by content hashes."""
+    
+    def test_zip_per_batch(self, output):
+        folder, manifest = output
+        for name in ("a.xliff", "b.xliff", "c.xliff"):
+            add_output(manifest, name)
+        translate_xliff_google.zip_batch_folders()
+        with zipfile.ZipFile(folder / "batch_1.zip") as zf:
+            assert sorted(zf.namelist()) == ["a.xliff", "b.xliff"]
+        with zipfile.ZipFile(folder / "batch_2.zip") as zf:
+            assert zf.namelist() == ["c.xliff"]
+    
+    def test_unchanged_content_is_up_to_date_despite_mtime(self, output, capsys):
+        folder, manifest = output
+        path = add_output(manifest, "a.xliff")
+        translate_xliff_google.zip_batch_folders()
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 3600))
+        translate_xliff_google.zip_batch_folders()
+        assert "Sudah up-to-date" in capsys.readouterr().out
+    
+    def test_new_member_is_appended(self, output, capsys):
+        folder, manifest = output
+        add_output(manifest, "a.xliff")
+        translate_xliff_google.zip_batch_folders()
+        add_output(manifest, "b.xliff")
+        translate_xliff_google.zip_batch_folders()
+        assert "(appended)" in capsys.readouterr().out
+        with zipfile.ZipFile(folder / "batch_1.zip") as zf:
+            assert sorted(zf.namelist()) == ["a.xliff", "b.xliff"]
+    
+    def test_changed_member_is_replaced(self, output):
+        folder, manifest = output
+        path = add_output(manifest, "a.xliff")
+        translate_xliff_google.zip_batch_folders()
+        path.write_text("<xliff>reviewed</xliff>", encoding="utf-8")
+        translate_xliff_google.zip_batch_folders()
+        with zipfile.ZipFile(folder / "batch_1.zip") as zf:
+            assert zf.namelist() == ["a.xliff"]
+            assert zf.read("a.xliff") == b"<xliff>reviewed</xliff>"
+    
+    def test_store_only(self, output):
+        folder, manifest = output
+        add_output(manifest, "a.xliff", "<xliff>" + "x" * 1000 + "</xliff>")
+        translate_xliff_google.zip_batch_folders(store_only=True)
+        with zipfile.ZipFile(folder / "batch_1.zip") as zf:
+            assert zf.getinfo("a.xliff").compress_type == zipfile.ZIP_STORED
+    
+    def test_parallel_workers(self, output, monkeypatch):
+        folder, manifest = output
+        monkeypatch.setattr(translate_xliff_google, "ZIP_WORKERS", 2)
+        for name in ("a.xliff", "b.xliff", "c.xliff"):
+            add_output(manifest, name)
+        translate_xliff_google.zip_batch_folders()
+        assert (folder / "batch_1.zip").exists() and (folder / "batch_2.zip").exists()
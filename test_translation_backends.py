@@ -0,0 +1,110 @@
+"""
+Test Suite for translation_backends.py
+=======================================
+Run with: pytest test_translation_backends.py -v
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from translation_backends import (
+    TRANSLATION_BACKENDS,
+    check_backend_cached,
+    get_backend,
+    pseudo_localize,
+    convert_lang_for_google,
+)
+
+
+class TestRegistry:
+    """Test backend lookup and declared capabilities."""
+
+    def test_builtin_backends_registered(self):
+        assert {'deepl', 'google', 'pseudo'} <= set(TRANSLATION_BACKENDS)
+        for backend in TRANSLATION_BACKENDS.values():
+            assert backend['max_segments'] > 0
+            assert backend['max_chars'] > 0
+            assert backend['payload'] in ('json', 'form')
+
+    def test_unknown_backend(self):
+        with pytest.raises(KeyError, match="pseudo"):
+            get_backend("yandex")
+
+    def test_pseudo_is_offline(self):
+        backend = get_backend("pseudo")
+        assert backend['requires_network'] is False
+        assert backend['billing_unit'] == 'none'
+
+    def test_convert_lang_for_google(self):
+        assert convert_lang_for_google("EN-US") == "en"
+        assert convert_lang_for_google("ES") == "es"
+        assert convert_lang_for_google(None) == "en"
+
+
+class TestPseudoLocalize:
+    """Test the deterministic pseudo-translation."""
+
+    def test_accents_text_and_wraps(self):
+        assert pseudo_localize("Kanzlei") == "⟦Káñžléí⟧"
+        assert pseudo_localize("Kanzlei") == pseudo_localize("Kanzlei")
+
+    def test_keeps_markup_and_tokens(self):
+        text = '<a href="https://ra-cocron.de/kontakt">Kontakt</a> &amp; {post_title} info@ra-cocron.de'
+        result = pseudo_localize(text)
+        assert '<a href="https://ra-cocron.de/kontakt">' in result
+        assert '&amp;' in result
+        assert '{post_title}' in result
+        assert 'info@ra-cocron.de' in result
+        assert 'Kóñtákt' in result
+
+    def test_blank_unchanged(self):
+        assert pseudo_localize("") == ""
+        assert pseudo_localize("   ") == "   "
+
+    def test_translate_batch(self):
+        backend = get_backend("pseudo")
+        client = backend['connect'](None)
+        assert backend['translate'](client, ["Eins", "Zwei"], "EN-US") == ["⟦Éíñš⟧", "⟦Zwéí⟧"]
+
+
+class TestHealthCheckCache:
+    """Test the cached credential check."""
+
+    @pytest.fixture
+    def checks(self, monkeypatch):
+        calls = []
+
+        def check(client):
+            calls.append(client)
+            if client == "bad":
+                raise Exception("401 Unauthorized")
+
+        monkeypatch.setitem(TRANSLATION_BACKENDS, "google", dict(TRANSLATION_BACKENDS["google"], check=check))
+        return calls
+
+    def test_cached_until_ttl(self, tmp_path, checks):
+        cache = tmp_path / "health.json"
+        assert check_backend_cached("google", "client", "key-1", ttl_hours=1, cache_file=cache) is True
+        assert check_backend_cached("google", "client", "key-1", ttl_hours=1, cache_file=cache) is False
+        assert "key-1" not in cache.read_text(encoding="utf-8")
+        assert check_backend_cached("google", "client", "key-1", ttl_hours=0, cache_file=cache) is True
+        assert len(checks) == 2
+
+    def test_other_key_is_checked(self, tmp_path, checks):
+        cache = tmp_path / "health.json"
+        check_backend_cached("google", "client", "key-1", ttl_hours=1, cache_file=cache)
+        assert check_backend_cached("google", "client", "key-2", ttl_hours=1, cache_file=cache) is True
+
+    def test_failure_is_not_cached(self, tmp_path, checks):
+        cache = tmp_path / "health.json"
+        for _ in range(2):
+            with pytest.raises(Exception, match="401"):
+                check_backend_cached("google", "bad", "key-1", ttl_hours=1, cache_file=cache)
+        assert len(checks) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,91 @@
+"""
+Test Suite for translation_memory.py
+=====================================
+Run with: pytest test_translation_memory.py -v
+"""
+
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from translation_memory import (
+    TranslationMemory,
+    normalize_source_text,
+    make_memory_key,
+)
+
+
+@pytest.fixture
+def memory(tmp_path):
+    tm = TranslationMemory(tmp_path / "tm.sqlite3", lru_size=2)
+    yield tm
+    tm.close()
+
+
+class TestMemoryKey:
+    """Test key normalization."""
+    
+    def test_normalize_whitespace(self):
+        assert normalize_source_text("  Hallo \n  Welt ") == "Hallo Welt"
+        assert normalize_source_text(None) == ""
+    
+    def test_key_depends_on_languages_and_backend(self):
+        base = make_memory_key("Kanzlei", "DE", "EN-US", "deepl")
+        assert base == make_memory_key(" Kanzlei ", "de", "en-us", "DeepL")
+        assert base != make_memory_key("Kanzlei", "DE", "ES", "deepl")
+        assert base != make_memory_key("Kanzlei", "DE", "EN-US", "google")
+
+
+class TestTranslationMemory:
+    """Test lookup, persistence and eviction."""
+    
+    def test_miss_then_hit(self, memory):
+        assert memory.get_many(["Kanzlei"], "DE", "EN-US", "deepl") == {}
+        memory.put_many([("Kanzlei", "Law Firm")], "DE", "EN-US", "deepl")
+        assert memory.get_many(["Kanzlei"], "DE", "EN-US", "deepl") == {"Kanzlei": "Law Firm"}
+        assert memory.hits == 1
+        assert memory.misses == 1
+    
+    def test_estimate_lookup_is_read_only(self, memory):
+        memory.put_many([("Kanzlei", "Law Firm")], "DE", "EN-US", "deepl")
+        memory._lru.clear()
+        memory._conn.execute("UPDATE translations SET last_used = 1")
+        found = memory.get_many(["Kanzlei", "Notar"], "DE", "EN-US", "deepl", count_stats=False)
+        assert found == {"Kanzlei": "Law Firm"}
+        assert memory._conn.execute("SELECT last_used FROM translations").fetchone()[0] == 1
+        assert memory.hits == 0 and memory.misses == 0
+    
+    def test_outer_whitespace_follows_source(self, memory):
+        memory.put_many([("München: ", "Munich: ")], "DE", "EN-US", "deepl")
+        assert memory.get_many(["München:"], "DE", "EN-US", "deepl") == {"München:": "Munich:"}
+        assert memory.get_many([" München: "], "DE", "EN-US", "deepl") == {" München: ": " Munich: "}
+    
+    def test_persists_beyond_lru(self, memory, tmp_path):
+        pairs = [("Eins", "One"), ("Zwei", "Two"), ("Drei", "Three")]
+        memory.put_many(pairs, "DE", "EN-US", "deepl")
+        reopened = TranslationMemory(tmp_path / "tm.sqlite3")
+        assert reopened.get_many(["Eins"], "DE", "EN-US", "deepl") == {"Eins": "One"}
+        reopened.close()
+    
+    def test_ttl_expiry(self, tmp_path):
+        tm = TranslationMemory(tmp_path / "tm.sqlite3", ttl_days=1)
+        tm.put_many([("Alt", "Old")], "DE", "EN-US", "deepl")
+        tm._lru.clear()
+        tm._conn.execute("UPDATE translations SET created_at = ?", (time.time() - 2 * 86400,))
+        assert tm.get_many(["Alt"], "DE", "EN-US", "deepl") == {}
+        tm.close()
+    
+    def test_max_entries_prune(self, tmp_path):
+        tm = TranslationMemory(tmp_path / "tm.sqlite3", max_entries=2)
+        tm.put_many([("A", "a"), ("B", "b"), ("C", "c")], "DE", "EN-US", "deepl")
+        tm.prune()
+        count = tm._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        assert count == 2
+        tm.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -9,18 +9,36 @@ Cara penggunaan:
 2. Letakkan file-file XLIFF di folder 'input'
 3. Jalankan script: python translate_xliff_google.py
 4. Hasil terjemahan akan tersimpan di folder 'output'
+5. batch_N.zip dibuat/diperbarui otomatis; tambahkan --store untuk zip tanpa
+   kompresi (lebih cepat untuk handoff lokal)
 """
 
 import os
 import sys
 import re
-import time
 import html
+import shutil
+import hashlib
 import zipfile
-import requests
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from translation_memory import get_translation_memory
+from http_session import HTTP_TIMEOUT, get_http_session, close_http_session
+from atomic_file import open_atomic
+from output_manifest import OutputManifest, hash_content
+from translation_backends import check_backend_cached
+from rate_limiter import (
+    MAX_RETRIES,
+    get_rate_limiter,
+    get_retry_after,
+    is_throttle_error,
+    parse_retry_after,
+    THROTTLE_STATUS_CODES,
+)
+
 # Fix encoding untuk Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -37,15 +55,23 @@ DEFAULT_TARGET_LANG = None  # None = wajib baca dari XLIFF
 INPUT_FOLDER = "input"
 OUTPUT_FOLDER = "output"
 
-# Rate limiting - delay dalam detik antar request ke Google
-DELAY_BETWEEN_REQUESTS = 0.1  # Google API lebih cepat
-DELAY_BETWEEN_FILES = 1  # 1 detik antar file
+# Rate limiting adaptif (token bucket + backoff) diatur di rate_limiter.py
 
 # Batch size - jumlah segment per batch untuk translasi
 BATCH_SIZE = 50  # Google Cloud mendukung batch lebih besar
 
 # Output batch - jumlah file per folder batch
 FILES_PER_BATCH = 5  # Maksimal 5 file per folder batch
+
+# Packaging batch_N.zip
+ZIP_STORE_ONLY = False  # True = tanpa kompresi (ZIP_STORED), untuk handoff lokal cepat. CLI: --store
+ZIP_WORKERS = None      # Proses kompresi paralel (None = jumlah CPU, 0/1 = di proses utama)
+
+# Translation Memory - segment yang sudah pernah diterjemahkan tidak dikirim ulang
+USE_TRANSLATION_MEMORY = True
+# Key backend di TM. Script ini menyimpan translatedText mentah (belum di-decode),
+# jadi dipisah dari entry "google" milik translate_xliff.py yang sudah di-unescape.
+TM_BACKEND_NAME = "google-raw"
 # =====================================================
 
 
@@ -56,44 +82,28 @@ def setup_folders():
     print(f"[OK] Folder '{INPUT_FOLDER}' dan '{OUTPUT_FOLDER}' siap digunakan")
 
 
-def get_current_batch_folder():
+_manifest = None
+
+
+def get_output_manifest():
     """
-    Mendapatkan folder batch yang aktif untuk menyimpan output.
-    Akan membuat batch baru jika batch saat ini sudah penuh (>= FILES_PER_BATCH).
-    
-    Output structure:
+    Manifest output (output_manifest.py) untuk OUTPUT_FOLDER, dibuka sekali.
+    Menentukan folder batch aktif tanpa scan:
     - output/batch_1/ (max 5 files)
     - output/batch_2/ (max 5 files)
     - ...
     """
-    output_path = Path(OUTPUT_FOLDER)
-    
-    # Cari semua folder batch yang ada
-    batch_folders = sorted([
-        d for d in output_path.iterdir() 
-        if d.is_dir() and d.name.startswith('batch_')
-    ], key=lambda x: int(x.name.split('_')[1]) if x.name.split('_')[1].isdigit() else 0)
-    
-    if not batch_folders:
-        # Belum ada batch folder, buat batch_1
-        new_batch = output_path / 'batch_1'
-        new_batch.mkdir(exist_ok=True)
-        print(f"  [BATCH] Membuat folder baru: {new_batch}")
-        return new_batch
-    
-    # Cek batch terakhir
-    last_batch = batch_folders[-1]
-    xliff_files = list(last_batch.glob('*.xliff')) + list(last_batch.glob('*.xlf'))
-    
-    if len(xliff_files) >= FILES_PER_BATCH:
-        # Batch penuh, buat batch baru
-        batch_num = int(last_batch.name.split('_')[1]) + 1
-        new_batch = output_path / f'batch_{batch_num}'
-        new_batch.mkdir(exist_ok=True)
-        print(f"  [BATCH] Folder {last_batch.name} penuh ({len(xliff_files)} files), membuat: {new_batch}")
-        return new_batch
-    
-    return last_batch
+    global _manifest
+    if _manifest is None:
+        _manifest = OutputManifest(OUTPUT_FOLDER, FILES_PER_BATCH)
+    return _manifest
+
+
+def close_output_manifest():
+    global _manifest
+    if _manifest is not None:
+        _manifest.close()
+        _manifest = None
 
 
 def get_xliff_files():
@@ -151,45 +161,81 @@ def translate_batch_google(texts, target_lang, source_lang='de'):
     if not non_empty_texts:
         return texts  # Return original jika semua kosong
     
-    try:
-        # Rate limiting
-        time.sleep(DELAY_BETWEEN_REQUESTS)
-        
-        # Google Cloud Translation API v2
-        url = f"https://translation.googleapis.com/language/translate/v2"
-        
-        # Convert target language format (EN-US -> en, ES -> es)
-        google_target = target_lang.split('-')[0].lower()
-        
-        payload = {
-            'key': GOOGLE_API_KEY,
-            'q': non_empty_texts,
-            'target': google_target,
-            'source': source_lang.lower(),
-            'format': 'html'  # Preserve HTML tags
-        }
+    # Cek Translation Memory dulu, hanya yang belum ada yang dikirim ke API
+    memory = get_translation_memory() if USE_TRANSLATION_MEMORY else None
+    cached = {}
+    if memory:
+        cached = memory.get_many(non_empty_texts, source_lang, target_lang, TM_BACKEND_NAME)
+    
+    pending_texts = list(dict.fromkeys(t for t in non_empty_texts if t not in cached))
+    
+    translated = list(texts)  # Copy original
+    
+    if not pending_texts:
+        for idx in non_empty_indices:
+            translated[idx] = cached[texts[idx]]
+        return translated
+    
+    # Google Cloud Translation API v2
+    url = f"https://translation.googleapis.com/language/translate/v2"
+    
+    # Convert target language format (EN-US -> en, ES -> es)
+    google_target = target_lang.split('-')[0].lower()
+    
+    payload = {
+        'key': GOOGLE_API_KEY,
+        'q': pending_texts,
+        'target': google_target,
+        'source': source_lang.lower(),
+        'format': 'html'  # Preserve HTML tags
+    }
+    
+    limiter = get_rate_limiter('google')
+    
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            response = get_http_session().post(url, data=payload, timeout=HTTP_TIMEOUT)
+        except Exception as e:
+            if is_throttle_error(e) and attempt < MAX_RETRIES:
+                delay = limiter.on_throttle(attempt, get_retry_after(e))
+                print(f"\n[WAIT] Google sibuk, retry {attempt + 1}/{MAX_RETRIES} dalam {delay:.1f}s")
+                continue
+            print(f"\n[!] Error translating batch: {str(e)[:50]}")
+            return texts  # Return original on error
         
-        response = requests.post(url, data=payload)
+        # Throttled: honor Retry-After, otherwise exponential backoff
+        if response.status_code in THROTTLE_STATUS_CODES and attempt < MAX_RETRIES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            delay = limiter.on_throttle(attempt, retry_after)
+            print(f"\n[WAIT] Google HTTP {response.status_code}, retry {attempt + 1}/{MAX_RETRIES} dalam {delay:.1f}s")
+            continue
         
         if response.status_code == 200:
+            limiter.on_success()
             result = response.json()
             translations = result['data']['translations']
             
+            # Return raw text - decoding will be done later when we know CDATA status
+            fresh = {text: trans['translatedText'] for text, trans in zip(pending_texts, translations)}
+            if memory:
+                memory.put_many(fresh.items(), source_lang, target_lang, TM_BACKEND_NAME)
+            
             # Rebuild hasil dengan posisi yang benar
-            translated = list(texts)  # Copy original
-            for idx, trans in zip(non_empty_indices, translations):
-                # Return raw text - decoding will be done later when we know CDATA status
-                translated[idx] = trans['translatedText']
+            for idx in non_empty_indices:
+                text = texts[idx]
+                translated[idx] = cached[text] if text in cached else fresh[text]
             
             return translated
-        else:
-            error_msg = response.json().get('error', {}).get('message', 'Unknown error')
-            print(f"\n[!] Google API Error: {error_msg}")
-            return texts  # Return original on error
         
-    except Exception as e:
-        print(f"\n[!] Error translating batch: {str(e)[:50]}")
+        try:
+            error_msg = response.json().get('error', {}).get('message', 'Unknown error')
+        except ValueError:
+            error_msg = f"HTTP {response.status_code}"
+        print(f"\n[!] Google API Error: {error_msg}")
         return texts  # Return original on error
+    
+    return texts
 
 
 def extract_cdata_content(text):
@@ -485,23 +531,12 @@ def process_xliff_file_google(file_path, target_lang_override=None):
         
         fallback_output = f"{file_path.stem}_{target_lang}{file_path.suffix}"
         
-        # Cari di semua batch folders
-        output_base = Path(OUTPUT_FOLDER)
-        for batch_dir in output_base.iterdir():
-            if batch_dir.is_dir() and batch_dir.name.startswith('batch_'):
-                if (batch_dir / expected_output).exists():
-                    print(f"  [SKIP] Output sudah ada: {batch_dir.name}/{expected_output}")
-                    return -1
-                if expected_output != fallback_output and (batch_dir / fallback_output).exists():
-                    print(f"  [SKIP] Output sudah ada: {batch_dir.name}/{fallback_output}")
-                    return -1
-        
-        # Juga cek di root output folder (untuk file lama)
-        if (output_base / expected_output).exists():
-            print(f"  [SKIP] Output sudah ada: {expected_output}")
-            return -1
-        if expected_output != fallback_output and (output_base / fallback_output).exists():
-            print(f"  [SKIP] Output sudah ada: {fallback_output}")
+        # Cek di manifest (batch folders + root output folder untuk file lama)
+        manifest = get_output_manifest()
+        source_hash = hash_content(content)
+        existing = manifest.find([expected_output, fallback_output], source_hash, target_lang)
+        if existing is not None:
+            print(f"  [SKIP] Output sudah ada: {existing.relative_to(OUTPUT_FOLDER).as_posix()}")
             return -1
         
         # Pattern untuk menemukan trans-unit
@@ -577,44 +612,6 @@ def process_xliff_file_google(file_path, target_lang_override=None):
                 translated = smart_title_case(translated)
             translated_texts[idx] = translated
         
-        # Replace dalam content
-        new_content = content
-        translated_count = 0
-        for i in range(len(matches) - 1, -1, -1):
-            match = matches[i]
-            translated = translated_texts[i]
-            was_cdata = cdata_flags[i]
-            was_skipped = skip_flags[i]
-            
-            if was_cdata:
-                new_target_content = f"<![CDATA[{translated}]]>"
-            else:
-                new_target_content = translated
-            
-            target_tag = match.group(5)
-            new_target_tag = re.sub(
-                r'state="[^"]*"',
-                'state="translated"',
-                target_tag
-            )
-            if 'state=' not in new_target_tag:
-                new_target_tag = target_tag.replace('>', ' state="translated">', 1)
-            
-            new_trans_unit = (
-                match.group(1) +
-                match.group(2) +
-                match.group(3) +
-                match.group(4) +
-                new_target_tag +
-                new_target_content +
-                match.group(7)
-            )
-            
-            new_content = new_content[:match.start()] + new_trans_unit + new_content[match.end():]
-            
-            if not was_skipped:
-                translated_count += 1
-        
         # Simpan hasil ke batch folder
         xliff_title = extract_title_from_xliff(content)
         if xliff_title:
@@ -622,12 +619,50 @@ def process_xliff_file_google(file_path, target_lang_override=None):
         else:
             output_filename = f"{file_path.stem}_{target_lang}{file_path.suffix}"
         
-        # Dapatkan folder batch yang aktif
-        batch_folder = get_current_batch_folder()
-        output_path = batch_folder / output_filename
+        # Dapatkan slot di folder batch yang aktif (dicatat pending di manifest)
+        output_path, new_batch = manifest.reserve(output_filename, source_hash, target_lang)
+        if new_batch:
+            print(f"  [BATCH] Membuat folder baru: {output_path.parent}")
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        # Satu pass: tulis bagian yang tidak berubah + target baru ke file
+        # sementara, lalu rename atomik (tidak ada XLIFF terpotong di output)
+        translated_count = 0
+        try:
+            with open_atomic(output_path) as out:
+                pos = 0
+                for i, match in enumerate(matches):
+                    translated = translated_texts[i]
+                    was_cdata = cdata_flags[i]
+                    was_skipped = skip_flags[i]
+                    
+                    if was_cdata:
+                        new_target_content = f"<![CDATA[{translated}]]>"
+                    else:
+                        new_target_content = translated
+                    
+                    target_tag = match.group(5)
+                    new_target_tag = re.sub(
+                        r'state="[^"]*"',
+                        'state="translated"',
+                        target_tag
+                    )
+                    if 'state=' not in new_target_tag:
+                        new_target_tag = target_tag.replace('>', ' state="translated">', 1)
+                    
+                    out.write(content[pos:match.start(5)])
+                    out.write(new_target_tag)
+                    out.write(new_target_content)
+                    out.write(match.group(7))
+                    pos = match.end(7)
+                    
+                    if not was_skipped:
+                        translated_count += 1
+                
+                out.write(content[pos:])
+        except BaseException:
+            manifest.release(output_filename)
+            raise
+        manifest.commit(output_filename)
         
         print(f"  [DONE] Selesai! {translated_count} segment diterjemahkan, {segments_to_skip} dilewati")
         print(f"  [SAVED] Tersimpan: {output_path}")
@@ -657,20 +692,22 @@ def main():
     # Setup
     setup_folders()
     
-    # Test API Key
+    # Test API Key (endpoint /languages, tidak ditagih; hasil sukses di-cache)
     print("\n[INFO] Testing Google Cloud Translation API...")
     try:
-        test_result = translate_batch_google(["Hello"], "EN-US", "en")
-        if test_result:
+        if check_backend_cached('google', {'api_key': GOOGLE_API_KEY}, GOOGLE_API_KEY):
             print("[OK] Google Cloud Translation API siap digunakan!")
+        else:
+            print("[OK] Google Cloud Translation API siap digunakan! (cek kredensial dari cache)")
     except Exception as e:
         print(f"[ERROR] Gagal terhubung ke Google API: {e}")
         sys.exit(1)
     
     # Cek command line override
     target_lang_override = None
-    if len(sys.argv) > 1:
-        target_lang_override = sys.argv[1].upper()
+    positional = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if positional:
+        target_lang_override = positional[0].upper()
         print(f"\n[TARGET] Override bahasa target: {target_lang_override}")
     else:
         print(f"\n[TARGET] Bahasa target: Otomatis dari file XLIFF")
@@ -687,7 +724,7 @@ def main():
     for f in xliff_files:
         print(f"        - {f.name}")
     
-    print(f"\n[CONFIG] Rate limiting: {DELAY_BETWEEN_REQUESTS}s antar request, {DELAY_BETWEEN_FILES}s antar file")
+    print(f"\n[CONFIG] Rate limiting: adaptif (token bucket + backoff, lihat rate_limiter.py)")
     print(f"[CONFIG] Batch size: {BATCH_SIZE} segment per request")
     
     # Proses semua file
@@ -718,10 +755,6 @@ def main():
                 os.remove(xliff_file)
             except Exception as e:
                 print(f"  [!] Gagal menghapus input: {e}")
-            
-            if i < len(xliff_files) - 1:
-                print(f"\n[WAIT] Waiting {DELAY_BETWEEN_FILES}s before next file...")
-                time.sleep(DELAY_BETWEEN_FILES)
     
     # Summary
     end_time = datetime.now()
@@ -738,61 +771,105 @@ def main():
     print("=" * 60)
 
 
-def zip_batch_folders():
+def hash_file(path):
+    """Content hash of a file (packaging tidak bergantung pada mtime)."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def package_batch(zip_path, files, zipped, store_only=False):
+    """
+    Bring one batch_N.zip up to date with files ({member: path}).
+    zipped is {member: content hash} recorded at the last packaging.
+    New members are appended to a copy of the existing archive (existing
+    members are not recompressed); a changed or removed member needs a
+    rebuild because the zip format cannot replace a member in place.
+    Runs in a worker process. Returns (status, {member: content hash}).
     """
-    Membuat file ZIP untuk setiap batch folder yang penuh.
-    File zip akan disimpan di folder output dengan nama batch_X.zip
+    zip_path = Path(zip_path)
+    hashes = {name: hash_file(path) for name, path in files.items()}
+    has_zip = zip_path.exists()
+    if has_zip and hashes == zipped:
+        return 'up-to-date', hashes
+    
+    compression = zipfile.ZIP_STORED if store_only else zipfile.ZIP_DEFLATED
+    can_append = has_zip and zipped and all(hashes.get(name) == h for name, h in zipped.items())
+    with open_atomic(zip_path, 'w+b') as out:
+        if can_append:
+            with open(zip_path, 'rb') as existing:
+                shutil.copyfileobj(existing, out)
+            out.seek(0)
+            with zipfile.ZipFile(out, 'a', compression) as zf:
+                for name in files:
+                    if name not in zipped:
+                        zf.write(files[name], name)
+            return 'appended', hashes
+        
+        with zipfile.ZipFile(out, 'w', compression) as zf:
+            for name in sorted(files):
+                # Simpan dengan nama file saja (tanpa path)
+                zf.write(files[name], name)
+    return 'rebuilt', hashes
+
+
+def zip_batch_folders(store_only=ZIP_STORE_ONLY):
+    """
+    Membuat/memperbarui file ZIP untuk setiap batch folder.
+    File zip akan disimpan di folder output dengan nama batch_X.zip.
+    Batch dan hash member diambil dari manifest output; hanya member yang
+    berubah yang ditulis, dan beberapa batch dikompres paralel.
     """
     output_path = Path(OUTPUT_FOLDER)
+    manifest = get_output_manifest()
+    batches = manifest.batch_outputs()
     
-    # Cari semua batch folders
-    batch_folders = sorted([
-        d for d in output_path.iterdir() 
-        if d.is_dir() and d.name.startswith('batch_')
-    ], key=lambda x: int(x.name.split('_')[1]) if x.name.split('_')[1].isdigit() else 0)
-    
-    if not batch_folders:
+    if not batches:
         print("\n[ZIP] Tidak ada batch folder untuk di-zip")
         return
     
     print("\n" + "=" * 60)
-    print("    MEMBUAT ZIP FILES")
+    print("    MEMBUAT ZIP FILES" + (" (store only)" if store_only else ""))
     print("=" * 60)
     
-    for batch_folder in batch_folders:
-        xliff_files = list(batch_folder.glob('*.xliff')) + list(batch_folder.glob('*.xlf'))
-        
-        if not xliff_files:
-            print(f"[ZIP] {batch_folder.name}: Folder kosong, skip")
+    jobs = {}
+    for batch, names in batches.items():
+        files = {name: manifest.path_for(name, batch) for name in names}
+        files = {name: path for name, path in files.items() if path.exists()}
+        if not files:
+            print(f"[ZIP] batch_{batch}: Folder kosong, skip")
             continue
-        
-        zip_filename = f"{batch_folder.name}.zip"
-        zip_path = output_path / zip_filename
-        
-        # Cek jika zip sudah ada dan up-to-date
-        if zip_path.exists():
-            # Cek apakah ada file baru sejak zip dibuat
-            zip_mtime = zip_path.stat().st_mtime
-            newest_file_mtime = max(f.stat().st_mtime for f in xliff_files)
-            
-            if zip_mtime > newest_file_mtime:
-                print(f"[ZIP] {zip_filename}: Sudah up-to-date ({len(xliff_files)} files)")
+        jobs[batch] = (output_path / f"batch_{batch}.zip", files, manifest.zipped_members(batch))
+    
+    workers = (os.cpu_count() or 1) if ZIP_WORKERS is None else ZIP_WORKERS
+    workers = min(workers, len(jobs))
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {batch: pool.submit(package_batch, *job, store_only) for batch, job in jobs.items()} if pool else {}
+        for batch, (zip_path, files, _) in jobs.items():
+            try:
+                if pool:
+                    status, hashes = futures[batch].result()
+                else:
+                    status, hashes = package_batch(*jobs[batch], store_only)
+            except Exception as e:
+                print(f"[ZIP] {zip_path.name}: Error - {e}")
                 continue
-        
-        # Buat zip file
-        try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                for xliff_file in xliff_files:
-                    # Simpan dengan nama file saja (tanpa path)
-                    zf.write(xliff_file, xliff_file.name)
             
-            zip_size_kb = zip_path.stat().st_size / 1024
-            print(f"[ZIP] {zip_filename}: {len(xliff_files)} files, {zip_size_kb:.1f} KB")
-        except Exception as e:
-            print(f"[ZIP] {zip_filename}: Error - {e}")
+            manifest.record_zip(batch, hashes)
+            if status == 'up-to-date':
+                print(f"[ZIP] {zip_path.name}: Sudah up-to-date ({len(files)} files)")
+            else:
+                zip_size_kb = zip_path.stat().st_size / 1024
+                print(f"[ZIP] {zip_path.name}: {len(files)} files, {zip_size_kb:.1f} KB ({status})")
+    finally:
+        if pool:
+            pool.shutdown()
 
 
 if __name__ == "__main__":
     main()
+    close_http_session()
     # Buat zip files setelah translasi selesai
-    zip_batch_folders()
+    zip_batch_folders(ZIP_STORE_ONLY or '--store' in sys.argv)
+    close_output_manifest()
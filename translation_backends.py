@@ -0,0 +1,259 @@
+"""
+Translation Backend Registry untuk XLIFF Batch Translator
+==========================================================
+Setiap backend didaftarkan dengan fungsi connect/translate dan kapabilitasnya
+(ukuran batch maksimal, dukungan HTML, satuan billing). translate_xliff.py
+memilih backend lewat TRANSLATION_API atau --backend.
+
+Backend bawaan:
+- deepl  : DeepL API (tag_handling='html')
+- google : Google Cloud Translation v2 REST (format=html)
+- pseudo : Pseudo-localization offline & deterministik, tanpa network dan
+           tanpa billing. Untuk menjalankan dan mengukur pipeline
+           parse/classify/post-process/write pada seluruh corpus.
+
+Cek kredensial memakai endpoint yang tidak ditagih (DeepL /usage, Google
+/languages) dan hasil suksesnya di-cache di HEALTH_CACHE_FILE selama
+HEALTH_CHECK_TTL_HOURS, sehingga start berikutnya tanpa request sama sekali.
+SDK backend (deepl, requests) baru di-import saat backend dipakai.
+"""
+
+import re
+import json
+import html
+import time
+import hashlib
+
+from http_session import HTTP_TIMEOUT, get_http_session
+from atomic_file import open_atomic
+
+# ==================== KONFIGURASI ====================
+HEALTH_CACHE_FILE = ".backend_health.json"
+HEALTH_CHECK_TTL_HOURS = 24   # Cek kredensial yang sukses dipakai ulang selama ini (0 = selalu cek)
+# =====================================================
+
+# ==================== LANGUAGE CODE MAPPING ====================
+# DeepL uses uppercase codes like 'EN-US', Google uses lowercase like 'en'
+DEEPL_TO_GOOGLE_LANG = {
+    'DE': 'de', 'EN': 'en', 'EN-US': 'en', 'EN-GB': 'en',
+    'ES': 'es', 'FR': 'fr', 'IT': 'it', 'PT': 'pt', 'PT-BR': 'pt',
+    'NL': 'nl', 'PL': 'pl', 'RU': 'ru', 'JA': 'ja', 'ZH': 'zh',
+}
+
+def convert_lang_for_google(lang_code):
+    """Convert DeepL language code to Google format."""
+    if not lang_code:
+        return 'en'
+    return DEEPL_TO_GOOGLE_LANG.get(lang_code.upper(), lang_code.lower())
+# ==================== END LANGUAGE MAPPING ====================
+
+
+TRANSLATION_BACKENDS = {}
+
+
+def register_backend(name, connect, translate, usage=None, check=None,
+                     max_segments=50, max_chars=30000, max_request_bytes=128000,
+                     payload='json', supports_html=True, billing_unit='characters',
+                     requires_network=True, description=''):
+    """
+    Register a translation backend.
+
+    connect(api_key) -> client
+    translate(client, texts, target_lang, source_lang) -> list of translations
+    usage(client) -> (used, limit) or None
+    check(client) -> raises if the credentials/endpoint are not usable
+    """
+    TRANSLATION_BACKENDS[name] = {
+        'name': name,
+        'connect': connect,
+        'translate': translate,
+        'usage': usage,
+        'check': check,
+        'max_segments': max_segments,
+        'max_chars': max_chars,
+        'max_request_bytes': max_request_bytes,
+        'payload': payload,
+        'supports_html': supports_html,
+        'billing_unit': billing_unit,
+        'requires_network': requires_network,
+        'description': description,
+    }
+    return TRANSLATION_BACKENDS[name]
+
+
+def _credential_fingerprint(name, api_key):
+    # Key tidak pernah disimpan, hanya hash-nya
+    return hashlib.sha256(f"{name}\x1f{api_key or ''}".encode('utf-8')).hexdigest()[:16]
+
+
+def _load_health_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_backend_check_cached(name, api_key, ttl_hours=None, cache_file=None):
+    """True if a successful check for this backend and key is younger than ttl_hours."""
+    ttl_hours = HEALTH_CHECK_TTL_HOURS if ttl_hours is None else ttl_hours
+    if not ttl_hours:
+        return False
+    entry = _load_health_cache(cache_file or HEALTH_CACHE_FILE).get(name)
+    return bool(entry
+                and entry.get('key') == _credential_fingerprint(name, api_key)
+                and time.time() - entry.get('checked_at', 0) < ttl_hours * 3600)
+
+
+def record_backend_check(name, api_key, cache_file=None):
+    """Remember a successful credential check (failures are never cached)."""
+    cache_file = cache_file or HEALTH_CACHE_FILE
+    cache = _load_health_cache(cache_file)
+    cache[name] = {'key': _credential_fingerprint(name, api_key), 'checked_at': time.time()}
+    try:
+        with open_atomic(cache_file) as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
+
+def check_backend_cached(name, client, api_key, ttl_hours=None, cache_file=None):
+    """
+    Run the backend's check(client) unless a cached successful check is still fresh.
+    Returns True if the check ran, False if the cached result was used.
+    """
+    if is_backend_check_cached(name, api_key, ttl_hours, cache_file):
+        return False
+    check = get_backend(name)['check']
+    if check:
+        check(client)
+    record_backend_check(name, api_key, cache_file)
+    return True
+
+
+def get_backend(name):
+    """Look up a registered backend by name (KeyError if unknown)."""
+    try:
+        return TRANSLATION_BACKENDS[name]
+    except KeyError:
+        available = ', '.join(sorted(TRANSLATION_BACKENDS))
+        raise KeyError(f"Backend '{name}' tidak dikenal (tersedia: {available})") from None
+
+
+# ==================== DEEPL ====================
+def _deepl_connect(api_key):
+    import deepl
+    return deepl.Translator(api_key)
+
+
+def _deepl_translate(client, texts, target_lang, source_lang=None):
+    # Use tag_handling='html' to preserve HTML tags like <strong>, <em>, etc.
+    results = client.translate_text(texts, target_lang=target_lang, tag_handling='html')
+    return [result.text for result in results]
+
+
+def _deepl_usage(client):
+    usage = client.get_usage()
+    if usage.character.valid:
+        return usage.character.count, usage.character.limit
+    return None
+
+
+def _deepl_check(client):
+    # /usage tidak ditagih dan gagal dengan AuthorizationException jika key salah
+    client.get_usage()
+
+
+register_backend(
+    'deepl', _deepl_connect, _deepl_translate, usage=_deepl_usage, check=_deepl_check,
+    max_segments=50,           # Maks. text parameter per request
+    max_chars=100000,
+    max_request_bytes=128000,  # Body limit 128 KiB
+    payload='form',
+    description='DeepL API',
+)
+
+
+# ==================== GOOGLE CLOUD TRANSLATION V2 ====================
+GOOGLE_TRANSLATE_URL = "https://translation.googleapis.com/language/translate/v2"
+
+
+def _google_connect(api_key):
+    return {'api_key': api_key}
+
+
+def _google_translate(client, texts, target_lang, source_lang=None):
+    # v2 accepts a list of q per request
+    url = f"{GOOGLE_TRANSLATE_URL}?key={client['api_key']}"
+    payload = {
+        "q": texts,
+        "target": convert_lang_for_google(target_lang),
+        "format": "html"  # Use "html" to preserve HTML tags like <strong>, <em>, etc.
+    }
+    response = get_http_session().post(url, json=payload, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    result = response.json()
+    # Decode HTML entities from Google
+    return [html.unescape(item['translatedText']) for item in result['data']['translations']]
+
+
+def _google_check(client):
+    # Daftar bahasa tidak ditagih (tidak ada karakter yang diterjemahkan)
+    url = f"{GOOGLE_TRANSLATE_URL}/languages?key={client['api_key']}"
+    response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+
+
+register_backend(
+    'google', _google_connect, _google_translate, check=_google_check,
+    max_segments=128,          # Maks. q entries per request
+    max_chars=30000,           # Maks. code points per request
+    max_request_bytes=200000,  # Body limit 204800 bytes, sisakan ruang untuk field lain
+    payload='json',
+    description='Google Cloud Translation v2 (REST)',
+)
+
+
+# ==================== PSEUDO-LOCALIZATION (OFFLINE) ====================
+PSEUDO_ACCENTS = str.maketrans(
+    'aeiouyAEIOUYcnsz',
+    'áéíóúýÁÉÍÓÚÝçñšž',
+)
+
+# Tags, entities, Bricks/JetEngine tokens, URLs and emails stay untouched
+_PSEUDO_PROTECTED_RE = re.compile(
+    r'(<[^>]+>|&#?\w+;|\{[^}]*\}|(?:https?|mailto|tel):[^\s<"]+|[\w.+-]+@[\w-]+\.[\w.-]+)'
+)
+
+
+def pseudo_localize(text, target_lang=None):
+    """
+    Deterministic pseudo-translation: accent the letters of text nodes and
+    wrap the segment in ⟦ ⟧ so untranslated strings stand out.
+    """
+    if not text or not text.strip():
+        return text
+    parts = _PSEUDO_PROTECTED_RE.split(text)
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].translate(PSEUDO_ACCENTS)
+    return '⟦' + ''.join(parts) + '⟧'
+
+
+def _pseudo_connect(api_key=None):
+    return None
+
+
+def _pseudo_translate(client, texts, target_lang, source_lang=None):
+    return [pseudo_localize(text, target_lang) for text in texts]
+
+
+register_backend(
+    'pseudo', _pseudo_connect, _pseudo_translate,
+    max_segments=1000,
+    max_chars=1000000,
+    max_request_bytes=10000000,
+    payload='json',
+    billing_unit='none',
+    requires_network=False,
+    description='Pseudo-localization offline (tanpa network, tanpa billing)',
+)
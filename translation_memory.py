@@ -0,0 +1,206 @@
+"""
+Translation Memory (TM) untuk XLIFF Batch Translator
+=====================================================
+Cache terjemahan persisten (SQLite) dengan tier LRU in-process di depannya.
+
+WPML meng-export ulang string yang sama (header, footer, Rank Math, boilerplate)
+di hampir setiap job. Dengan TM, segment yang pernah diterjemahkan tidak
+dikirim lagi ke DeepL/Google: tidak ada karakter yang ditagih dan tidak ada
+latency jaringan.
+
+Key   : normalized source text + source language + target language + backend
+Policy: entry kadaluarsa setelah TM_TTL_DAYS, dan database dipangkas ke
+        TM_MAX_ENTRIES entry yang paling baru dipakai (LRU di disk).
+"""
+
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# ==================== KONFIGURASI ====================
+TM_DB_PATH = "translation_memory.sqlite3"
+TM_LRU_SIZE = 5000          # Jumlah entry di tier in-process
+TM_TTL_DAYS = 180           # Entry lebih tua dari ini dianggap miss
+TM_MAX_ENTRIES = 200000     # Batas jumlah entry di SQLite
+# =====================================================
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_source_text(text):
+    """
+    Normalize source text for use as TM key.
+    NFC unicode form, outer whitespace stripped, inner whitespace collapsed.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def make_memory_key(text, source_lang, target_lang, backend):
+    """Build the TM key for a segment."""
+    parts = [
+        (backend or '').lower(),
+        (source_lang or 'auto').lower(),
+        (target_lang or '').upper(),
+        normalize_source_text(text),
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _restore_outer_whitespace(source, translated):
+    """Re-apply the source's leading/trailing whitespace to a cached translation."""
+    stripped = source.strip()
+    if not stripped:
+        return translated
+    start = source.find(stripped)
+    return source[:start] + translated + source[start + len(stripped):]
+
+
+class TranslationMemory:
+    """
+    SQLite-backed translation memory with an in-process LRU tier.
+    Thread-safe: satu koneksi dipakai bersama dan dijaga dengan lock.
+    """
+
+    def __init__(self, db_path=TM_DB_PATH, lru_size=TM_LRU_SIZE,
+                 ttl_days=TM_TTL_DAYS, max_entries=TM_MAX_ENTRIES):
+        self.db_path = str(db_path)
+        self.lru_size = lru_size
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            ' key TEXT PRIMARY KEY,'
+            ' backend TEXT, source_lang TEXT, target_lang TEXT,'
+            ' source_text TEXT, translated_text TEXT,'
+            ' created_at REAL, last_used REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)')
+        self._conn.commit()
+        self.prune()
+
+    def _lru_get(self, key):
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+        return value
+
+    def _lru_put(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, texts, source_lang, target_lang, backend, count_stats=True):
+        """
+        Look up texts in the memory.
+        Returns dict {text: translated_text} for hits only.
+        count_stats=False is a read-only lookup for cost estimates: the hit/miss
+        counters and the stored last_used times are left alone.
+        """
+        found = {}
+        if not texts:
+            return found
+
+        now = time.time()
+        keys = {}
+        with self._lock:
+            for text in texts:
+                if text in found or not text or not text.strip():
+                    continue
+                key = make_memory_key(text, source_lang, target_lang, backend)
+                value = self._lru_get(key)
+                if value is not None:
+                    found[text] = _restore_outer_whitespace(text, value)
+                else:
+                    keys.setdefault(key, []).append(text)
+
+            if keys:
+                key_list = list(keys)
+                used = []
+                # SQLite membatasi jumlah parameter per query
+                for i in range(0, len(key_list), 500):
+                    chunk = key_list[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = self._conn.execute(
+                        f'SELECT key, translated_text, created_at FROM translations WHERE key IN ({placeholders})',
+                        chunk
+                    ).fetchall()
+                    for key, value, created_at in rows:
+                        if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                            continue
+                        self._lru_put(key, value)
+                        used.append((now, key))
+                        for text in keys[key]:
+                            found[text] = _restore_outer_whitespace(text, value)
+                if used and count_stats:
+                    self._conn.executemany('UPDATE translations SET last_used = ? WHERE key = ?', used)
+                    self._conn.commit()
+
+            if count_stats:
+                self.hits += len(found)
+                self.misses += len(set(t for t in texts if t and t.strip())) - len(found)
+        return found
+
+    def put_many(self, pairs, source_lang, target_lang, backend):
+        """Store (source_text, translated_text) pairs in the memory."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for source, translated in pairs:
+                if not source or not source.strip() or not translated:
+                    continue
+                key = make_memory_key(source, source_lang, target_lang, backend)
+                value = translated.strip()
+                self._lru_put(key, value)
+                rows.append((key, backend, source_lang or 'auto', target_lang,
+                             source, value, now, now))
+            if rows:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+                )
+                self._conn.commit()
+
+    def prune(self):
+        """Apply TTL and max-entries eviction on the SQLite tier."""
+        with self._lock:
+            if self.ttl_seconds:
+                cutoff = time.time() - self.ttl_seconds
+                self._conn.execute('DELETE FROM translations WHERE created_at < ?', (cutoff,))
+            if self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM translations WHERE key NOT IN '
+                    '(SELECT key FROM translations ORDER BY last_used DESC LIMIT ?)',
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory(db_path=None):
+    """Return the process-wide TranslationMemory, opening it on first use."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory(db_path or TM_DB_PATH)
+        return _memory